@@ -0,0 +1,383 @@
+"""Benchmarks for the headless game engine.
+
+The suite times every engine operation on every preset of every mode plus
+large synthetic boards, and records the peak memory of each one with
+tracemalloc in a separate run so tracing does not skew the times. Each run is
+appended to a JSON history file and compare reports anything that got slower
+or bigger than a threshold between two runs.
+
+Usage (from this folder):
+	python Benchmark.py suite
+	python Benchmark.py suite --sizes 200 1000 --label before-change
+	python Benchmark.py compare                 last two runs
+	python Benchmark.py compare before-change -1 --threshold 0.2
+	python Benchmark.py reveal
+	python Benchmark.py reveal --size 3163 --repeat 1
+	python Benchmark.py view        (needs a display)
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import Engine
+import Scores
+import Topology
+
+MODES = {"normal": Engine.SQUARE, "hex": Engine.HEX}
+HISTORY = "benchmarks.json"
+DENSITY = 0.15
+CHECKS = 1000
+
+
+def recursive_reveal(model, i):
+	"""The recursive flood fill the grids used before the BFS reveal.
+
+	Kept only so the benchmark can compare against it.
+
+	Args:
+		model (Model): Board to reveal on.
+		i (int): Flat index of the cell to be revealed.
+	"""
+	if model.flag[i] or model.bomb[i] or not model.covered[i]:
+		return
+	model.covered[i] = 0
+	model.colour[i] = Engine.colour_class(model.number[i])
+	model.revealed += 1
+	model.safe_covered -= 1
+	if model.number[i] == 0:
+		for n in model.neighbours(i):
+			if model.covered[n]:
+				recursive_reveal(model, n)
+
+
+def reset(model):
+	"""Covers every cell again without touching the bombs."""
+	model.covered[:] = b"\x01" * model.size
+	model.colour[:] = bytes(model.size)
+	model.revealed = 0
+	model.safe_covered = model.size - len(model.bombs)
+	model.exploded = False
+
+
+def largest_opening(model):
+	"""Finds the zero cell that opens the most cells.
+
+	Returns:
+		cell ((int, int)): Flat index and how many cells it reveals.
+	"""
+	best = (None, 0)
+	seen = bytearray(model.size)
+	for i in range(model.size):
+		if model.bomb[i] or model.number[i] or seen[i]:
+			continue
+		opened = model.reveal(i)
+		for c in opened:
+			seen[c] = 1
+		if len(opened) > best[1]:
+			best = (i, len(opened))
+	reset(model)
+	return best
+
+
+def best_time(fn, repeat):
+	best = None
+	for _ in range(repeat):
+		start = time.perf_counter()
+		fn()
+		elapsed = time.perf_counter() - start
+		if best is None or elapsed < best:
+			best = elapsed
+	return best
+
+
+def bench_reveal(args):
+	sys.setrecursionlimit(max(sys.getrecursionlimit(), 20000))
+	print("{:8} {:12} {:>8} {:>12} {:>12} {:>8}".format("mode", "level", "cells", "recursive", "bfs", "speedup"))
+	for mode, topology in MODES.items():
+		for level, (x, y, bombs, _) in Engine.PRESETS[mode].items():
+			model = Engine.Model(x, y, topology)
+			model.place_bombs(bombs)
+			i, cells = largest_opening(model)
+			if i is None:
+				continue
+			old = best_time(lambda: (reset(model), recursive_reveal(model, i)), args.repeat)
+			new = best_time(lambda: (reset(model), model.reveal(i)), args.repeat)
+			print("{:8} {:12} {:>8} {:>10.3f}ms {:>10.3f}ms {:>7.2f}x".format(mode, level, cells, old*1000, new*1000, old/new))
+	for mode, topology in MODES.items():
+		model = Engine.Model(args.size, args.size, topology)
+		elapsed = best_time(lambda: (reset(model), model.reveal(0)), args.repeat)
+		rate = model.revealed / elapsed
+		print("{:8} {:12} {:>8} {:>12} {:>10.3f}ms   {:.2f}M cells/s".format(mode, "open", model.size, "-", elapsed*1000, rate/1e6))
+
+
+def new_model(mode, size_x, size_y):
+	if mode == "colour":
+		return Engine.ColourModel(size_x, size_y, Engine.HEX)
+	return Engine.Model(size_x, size_y, MODES[mode])
+
+
+def cold_model(mode, size_x, size_y):
+	"""Builds a model after dropping the cached neighbour offsets and count masks."""
+	Topology.neighbour_rows.cache_clear()
+	Topology.count_masks.cache_clear()
+	return new_model(mode, size_x, size_y)
+
+
+def placed_model(mode, size_x, size_y, layout):
+	model = new_model(mode, size_x, size_y)
+	model.set_bombs(layout)
+	return model
+
+
+def reveal_all(model, cells):
+	for i in cells:
+		model.reveal(i)
+
+
+def engine_cases(mode, size_x, size_y, bombs):
+	"""Operations timed on one board.
+
+	The layout is drawn from a fixed seed so every run times the same board.
+
+	Returns:
+		cases ((str, function, function)[]): Name, setup returning the
+			argument, and the timed call taking it.
+	"""
+	layout = random.Random(0).sample(range(size_x * size_y), bombs)
+	model = placed_model(mode, size_x, size_y, layout)
+	if mode == "colour":
+		# The colour game has no flood fill, every safe cell is painted one
+		# click at a time instead.
+		opening = [i for i in range(model.size) if not model.bomb[i]]
+	else:
+		largest = largest_opening(model)[0]
+		opening = [largest] if largest is not None else []
+
+	def flood_setup():
+		return placed_model(mode, size_x, size_y, layout), opening
+
+	def check_setup():
+		model = placed_model(mode, size_x, size_y, layout)
+		reveal_all(model, opening[:1])
+		return model
+
+	return [
+		("construct", lambda: None, lambda _: cold_model(mode, size_x, size_y)),
+		("place_bombs", lambda: new_model(mode, size_x, size_y), lambda model: model.place_bombs(bombs)),
+		("flood_fill", flood_setup, lambda state: reveal_all(*state)),
+		("check_game x{}".format(CHECKS), check_setup, lambda model: [model.check_game() for _ in range(CHECKS)]),
+		("check_counters", check_setup, lambda model: model.check_counters()),
+		("show_board", lambda: placed_model(mode, size_x, size_y, layout), lambda model: model.show_board()),
+		("__str__", check_setup, lambda model: str(model)),
+	]
+
+
+def score_cases(folder):
+	"""The SQLite high score path.
+
+	Times an insert and commit done in place, queueing a score on the
+	background writer as the boards do, and reading the first page of scores.
+
+	Returns:
+		result ((function, tuple[])): Closes the database and writer, and
+			the cases.
+	"""
+	path = os.path.join(folder, "scores.db")
+	database = sqlite3.connect(path)
+	Scores.prepare(database)
+	writer = Scores.ScoreWriter(path)
+	row = ("normal", "Hard", "bench", 30, 30, 100, 500)
+
+	def insert(_):
+		c = database.cursor()
+		c.execute("INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+		database.commit()
+
+	def close():
+		writer.close()
+		database.close()
+
+	return close, [
+		("insert_commit", lambda: None, insert),
+		("writer_add", lambda: None, lambda _: writer.add(row)),
+		("top_scores", lambda: None, lambda _: Scores.top_scores(database, "normal", "Hard")),
+	]
+
+
+def measure(setup, run, repeat):
+	"""Best time of repeat runs, then peak memory of one traced run.
+
+	Returns:
+		result (dict): Seconds and peak bytes allocated during the run.
+	"""
+	best = None
+	for _ in range(repeat):
+		state = setup()
+		start = time.perf_counter()
+		run(state)
+		elapsed = time.perf_counter() - start
+		if best is None or elapsed < best:
+			best = elapsed
+	state = setup()
+	tracemalloc.start()
+	run(state)
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return {"seconds": best, "peak": peak}
+
+
+def boards(sizes):
+	"""Every preset of every mode plus square synthetic boards."""
+	for mode in ("normal", "hex", "colour"):
+		for level, (x, y, bombs, _) in Engine.PRESETS[mode].items():
+			yield mode, level, x, y, bombs
+	for mode in MODES:
+		for side in sizes:
+			yield mode, "{0}x{0}".format(side), side, side, int(side * side * DENSITY)
+
+
+def load_history(path):
+	if not os.path.exists(path):
+		return list()
+	with open(path) as f:
+		return json.load(f)
+
+
+def bench_suite(args):
+	sys.setrecursionlimit(max(sys.getrecursionlimit(), 20000))
+	results = dict()
+	print("{:40} {:>12} {:>12}".format("case", "time", "peak"))
+
+	def record(name, setup, run, repeat):
+		result = measure(setup, run, repeat)
+		results[name] = result
+		print("{:40} {:>10.3f}ms {:>10.1f}KB".format(name, result["seconds"]*1000, result["peak"]/1024))
+		sys.stdout.flush()
+
+	for mode, level, x, y, bombs in boards(args.sizes):
+		repeat = args.repeat if x * y <= 10000 else max(1, args.repeat // 5)
+		for op, setup, run in engine_cases(mode, x, y, bombs):
+			record("{}/{}/{}".format(mode, level, op), setup, run, repeat)
+	with tempfile.TemporaryDirectory() as folder:
+		close, cases = score_cases(folder)
+		for op, setup, run in cases:
+			record("sqlite/{}".format(op), setup, run, args.repeat)
+		close()
+
+	history = load_history(args.history)
+	history.append({
+		"label": args.label,
+		"time": time.strftime("%Y-%m-%d %H:%M:%S"),
+		"python": platform.python_version(),
+		"machine": platform.machine(),
+		"results": results,
+	})
+	with open(args.history, "w") as f:
+		json.dump(history, f, indent=1)
+	print("run {} written to {}".format(len(history) - 1, args.history))
+
+
+def find_run(history, key):
+	"""Finds a run by label, or by index when the key is a number."""
+	for run in reversed(history):
+		if run["label"] == key:
+			return run
+	try:
+		return history[int(key)]
+	except (ValueError, IndexError):
+		raise SystemExit("no run {} in the history".format(key))
+
+
+def bench_compare(args):
+	history = load_history(args.history)
+	if len(history) < 2 and (args.old is None or args.new is None):
+		raise SystemExit("compare needs two runs in {}".format(args.history))
+	old = find_run(history, args.old if args.old is not None else -2)
+	new = find_run(history, args.new if args.new is not None else -1)
+	print("{:40} {:>10} {:>10} {:>8} {:>8}".format("case", "old", "new", "time", "peak"))
+	regressions = 0
+	for name, after in new["results"].items():
+		before = old["results"].get(name)
+		if before is None:
+			continue
+		time_change = after["seconds"] / before["seconds"] - 1 if before["seconds"] else 0.0
+		peak_change = after["peak"] / before["peak"] - 1 if before["peak"] else 0.0
+		flag = ""
+		if time_change > args.threshold or peak_change > args.threshold:
+			flag = "  REGRESSION"
+			regressions += 1
+		elif not args.all:
+			continue
+		print("{:40} {:>8.3f}ms {:>8.3f}ms {:>+7.1%} {:>+7.1%}{}".format(name, before["seconds"]*1000, after["seconds"]*1000, time_change, peak_change, flag))
+	print("{} regression(s) beyond {:.0%}".format(regressions, args.threshold))
+	if regressions:
+		sys.exit(1)
+
+
+def bench_view(args):
+	"""Times board construction and counts canvas items for the Tk grids."""
+	import tkinter as tk
+	import NormalGrid
+	import HexGrid
+	import ColourGrid
+	root = tk.Tk()
+	root.withdraw()
+	folder = tempfile.TemporaryDirectory()
+	path = os.path.join(folder.name, "scores.db")
+	database = sqlite3.connect(path)
+	Scores.prepare(database)
+	scores = Scores.ScoreWriter(path)
+	grids = {"normal": NormalGrid, "hex": HexGrid, "colour": ColourGrid}
+	print("{:8} {:12} {:>8} {:>12} {:>8}".format("mode", "level", "cells", "build", "items"))
+	for mode, module in grids.items():
+		for level, (x, y, bombs, time_limit) in Engine.PRESETS[mode].items():
+			window = tk.Toplevel(root)
+			start = time.perf_counter()
+			board = module.Board(window, x, y, bombs, time_limit, level, scores)
+			root.update_idletasks()
+			elapsed = time.perf_counter() - start
+			items = len(board.canv.find_all())
+			print("{:8} {:12} {:>8} {:>10.3f}ms {:>8}".format(mode, level, x*y, elapsed*1000, items))
+			window.destroy()
+	root.destroy()
+	scores.close()
+	database.close()
+	folder.cleanup()
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Minesweeper engine benchmarks")
+	commands = parser.add_subparsers(dest="command", required=True)
+	reveal = commands.add_parser("reveal", help="recursive vs BFS flood fill on every preset")
+	reveal.add_argument("--repeat", type=int, default=5)
+	reveal.add_argument("--size", type=int, default=1000, help="side of the empty synthetic board")
+	reveal.set_defaults(run=bench_reveal)
+	view = commands.add_parser("view", help="Tk board construction time and canvas item count")
+	view.set_defaults(run=bench_view)
+	suite = commands.add_parser("suite", help="time and peak memory of every engine operation")
+	suite.add_argument("--repeat", type=int, default=5)
+	suite.add_argument("--sizes", type=int, nargs="*", default=[200, 1000], help="sides of the synthetic boards")
+	suite.add_argument("--history", default=HISTORY, help="JSON file the run is appended to")
+	suite.add_argument("--label", help="name to find the run by in compare")
+	suite.set_defaults(run=bench_suite)
+	compare = commands.add_parser("compare", help="flag regressions between two suite runs")
+	compare.add_argument("old", nargs="?", help="label or index of the baseline run, -2 by default")
+	compare.add_argument("new", nargs="?", help="label or index of the new run, -1 by default")
+	compare.add_argument("--history", default=HISTORY)
+	compare.add_argument("--threshold", type=float, default=0.1, help="allowed growth, 0.1 is 10%%")
+	compare.add_argument("--all", action="store_true", help="list unchanged cases too")
+	compare.set_defaults(run=bench_compare)
+	args = parser.parse_args(argv)
+	args.run(args)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,750 @@
+import logging
+import time
+import tkinter as tk
+from tkinter import simpledialog, filedialog
+
+import Engine
+import Replay
+import Trace
+
+# Fill used for covered cells and for flagged cells.
+COVERED_FILL = '#ABB7B7'
+FLAG_FILL = '#26A65B'
+FLAG_TEXT = '#264348'
+# Outline of cells and of the cell under the pointer.
+OUTLINE = '#6C7A89'
+HOVER_OUTLINE = '#264348'
+# Largest canvas shown before the board scrolls, in pixels.
+VIEW_SIZE = 800
+# Cells materialised around the visible area so small scrolls need no work.
+MARGIN = 2
+FONT_SIZE = 15
+MIN_ZOOM = 0.25
+MAX_ZOOM = 4.0
+# Milliseconds between checks on a no-guess board being generated.
+GENERATE_POLL = 50
+
+log = logging.getLogger(__name__)
+
+
+class BoardView:
+	"""BoardView draws an Engine model onto a Tk canvas and handles input.
+
+	Subclasses pick the model and describe how each cell is drawn, the view
+	itself holds no game state beyond the canvas items on screen. The canvas
+	is a scrollable viewport: canvas items only exist for the visible cells
+	plus a margin, and are recycled through pools as the view scrolls or
+	zooms, so the item count is bounded by the screen and not the board.
+	Text items are only given to cells that show a number or flag.
+
+	Cell geometry is described at zoom 1 by the subclasses and scaled here.
+
+	Attributes:
+		game (str): Game type stored with the high scores.
+		topology (str): Topology tag of the model, Engine.SQUARE or Engine.HEX.
+		palette (dict): Fill used for each colour class of a revealed cell.
+		show_numbers (bool): Draw the neighbour count onto revealed cells.
+		show_flag_text (bool): Draw an "F" onto flagged cells.
+		pitch (int): Board size in pixels per cell at zoom 1.
+		model (Model): The headless game state.
+		zoom (float): Scale of the drawing.
+		items (dict): Shape canvas item of each materialised cell.
+		labels (dict): Text canvas item of each materialised cell showing text.
+		pool (list): Hidden shape items ready to be reused.
+		label_pool (list): Hidden text items ready to be reused.
+		drawn (dict): Fill, text and text colour currently on the canvas for
+			each materialised cell, used to skip redundant item updates.
+		dirty (set): Cells changed since the last flush.
+		hover (int): Cell under the pointer, None when outside the board.
+		over (bool): Set once the game has been won or lost.
+		pending_bombs (int): Bombs still to be placed on the first click of a
+			no-guess game, 0 once placed. Flags are ignored until then.
+		generation (Future): No-guess board being generated off the Tk
+			thread, None when there is none. Clicks are ignored meanwhile.
+		time_limit (int): Seconds the player had at the start.
+		shown (int): Time left currently on the timer label.
+		recorder (Recorder): Moves of this game, saved with a winning score.
+
+	"""
+	game = "normal"
+	topology = None
+	palette = {}
+	show_numbers = True
+	show_flag_text = True
+	pitch = 24
+
+	def __init__(self, root, size_x, size_y, bombs, time, mode, scores, no_guess=False, seed=None, saved=None, clock=None):
+		"""Board setup.
+
+		This setup creates the model and the viewport then sets cells drawn
+		from the seed to contain bombs. No-guess games place their bombs on
+		the first click instead, so the board can be built around it.
+		Resumed games take the model from their snapshot instead. Levels
+		Generator does not support get a random board and a notice.
+
+		Args:
+			root (Panel): Where the Canvas should be created.
+			size_x (int): The size of how many cells there should be in a column.
+			size_y (int): The size of how many cells there should be in a row.
+			bombs (int): Amount of bombs to be placed.
+			time (int): Seconds the player has to finish.
+			mode (str): Level name stored with the high scores.
+			scores (ScoreWriter): Where a winning score is saved.
+			no_guess (bool): Generate a board solvable without guessing.
+			seed (int): Seed the bombs are drawn from, random when None. The
+				same seed and level always give the same board.
+			saved (dict): Game resumed by Snapshot.resume, None for a new game.
+			clock (Clock): Shared clock that ticks the timer, None to leave
+				the board untimed.
+		"""
+		self.window = root
+		self.window.configure(background='#BDC3C7')
+		self.size_x = size_x
+		self.size_y = size_y
+		self.mode = mode
+		self.scores = scores
+		if saved is None:
+			self.model = self.create_model(size_x, size_y, seed)
+			self.time_limit = time
+			self.recorder = Replay.Recorder(self.game, time)
+		else:
+			self.model = saved["model"]
+			self.time_limit = saved["time_limit"]
+			self.recorder = Replay.Recorder(self.game, self.time_limit, saved["events"], saved["elapsed_ms"])
+
+		# timer setup
+		self.shown = None
+		self.timer = tk.Label(root, text="", background='#BDC3C7')
+		quitButton = tk.Button(root, text="Quit", background='#BDC3C7', command=lambda: self.quit())
+		saveButton = tk.Button(root, text="Save", background='#BDC3C7', command=lambda: self.save())
+		self.bomb_count = tk.Label(root, text="", background='#BDC3C7')
+		quitButton.grid(row=0, column=1)
+		saveButton.grid(row=0, column=3)
+		self.timer.grid(row=0, column=2)
+		self.bomb_count.grid(row=0, column=0)
+
+		self.build_view(min(self.pitch*size_x, VIEW_SIZE), min(self.pitch*size_y, VIEW_SIZE))
+		self.update_scrollregion()
+		self.pending_bombs = 0
+		self.bomb_count.configure(text="Bombs: " + str(bombs))
+		if saved is None:
+			if no_guess and self.no_guess_supported():
+				self.pending_bombs = bombs
+			else:
+				self.model.place_bombs(bombs)
+				if no_guess:
+					self.show_notice("no-guess boards are not offered on this level")
+		self.refresh_view()
+		self.show_time(self.remaining())
+		if clock is not None:
+			clock.add(self)
+
+	def build_view(self, width, height):
+		"""Creates the canvas viewport, its scrollbars and input bindings.
+
+		Args:
+			width (int): Canvas width in pixels.
+			height (int): Canvas height in pixels.
+		"""
+		root = self.window
+		self.canv = tk.Canvas(root, width=width, height=height, background='#BDC3C7', highlightbackground="green", highlightcolor="green")
+		self.xscroll = tk.Scrollbar(root, orient=tk.HORIZONTAL, command=self.canv.xview)
+		self.yscroll = tk.Scrollbar(root, orient=tk.VERTICAL, command=self.canv.yview)
+		self.canv.configure(xscrollcommand=self.on_xscroll, yscrollcommand=self.on_yscroll)
+		self.zoom = 1.0
+		self.items = dict()
+		self.labels = dict()
+		self.pool = list()
+		self.label_pool = list()
+		self.drawn = dict()
+		self.dirty = set()
+		self.flush_job = None
+		self.view_job = None
+		self.generate_job = None
+		self.generation = None
+		self.hover = None
+		self.over = False
+		self.canv.bind('<ButtonPress-1>', self.onObjectLeftClick)
+		self.canv.bind('<ButtonPress-3>', self.onObjectRightClick)
+		self.canv.bind('<Motion>', self.onPointerMove)
+		self.canv.bind('<B1-Motion>', self.onPointerMove)
+		self.canv.bind('<B3-Motion>', self.onPointerMove)
+		self.canv.bind('<Leave>', lambda event: self.set_hover(None))
+		self.canv.bind('<Configure>', lambda event: self.schedule_view())
+		self.canv.bind('<MouseWheel>', self.onWheel)
+		self.canv.bind('<Shift-MouseWheel>', self.onWheel)
+		self.canv.bind('<Control-MouseWheel>', self.onWheel)
+		for button in ('4', '5'):
+			self.canv.bind('<Button-' + button + '>', self.onWheel)
+			self.canv.bind('<Shift-Button-' + button + '>', self.onWheel)
+			self.canv.bind('<Control-Button-' + button + '>', self.onWheel)
+		self.canv.grid(row=1, columnspan=3)
+
+	def create_model(self, size_x, size_y, seed):
+		return Engine.Model(size_x, size_y, self.topology, seed=seed)
+
+	def shape_coords(self, x, y):
+		"""Coordinates of a cell shape at zoom 1.
+
+		Args:
+			x (int): x coordinate.
+			y (int): y coordinate.
+
+		Returns:
+			coords (float[]): Flat list of canvas coordinates.
+		"""
+		raise NotImplementedError
+
+	def text_position(self, x, y):
+		"""Centre of a cell label at zoom 1.
+
+		Returns:
+			position ((float, float)): Canvas coordinates.
+		"""
+		raise NotImplementedError
+
+	def create_shape(self, coords):
+		"""Creates the canvas item drawn for a cell shape.
+
+		Args:
+			coords (float[]): Scaled coordinates from shape_coords.
+
+		Returns:
+			item (int): The new canvas item.
+		"""
+		raise NotImplementedError
+
+	def cell_at(self, px, py):
+		"""Finds the cell drawn under a point with coordinate maths.
+
+		Args:
+			px (float): x coordinate at zoom 1.
+			py (float): y coordinate at zoom 1.
+
+		Returns:
+			cell ((int, int)): x and y coordinate of the cell, which may lie
+				outside the board, or None if the point is between cells.
+		"""
+		raise NotImplementedError
+
+	def event_cell(self, event):
+		"""Hit tests a mouse event in constant time.
+
+		Args:
+			event (Event): Details of the event that triggered.
+
+		Returns:
+			i (int): Flat index of the cell under the pointer, None if there
+				is no cell there.
+		"""
+		cell = self.cell_at(self.canv.canvasx(event.x) / self.zoom, self.canv.canvasy(event.y) / self.zoom)
+		if cell is None:
+			return None
+		x, y = cell
+		if 0 <= x < self.size_x and 0 <= y < self.size_y:
+			return self.model.index(x, y)
+		return None
+
+	def cell_coords(self, i):
+		"""x and y coordinate of a cell key used by the canvas items."""
+		return self.model.coords(i)
+
+	def quit(self):
+		for job in (self.flush_job, self.view_job, self.generate_job):
+			if job is not None:
+				self.canv.after_cancel(job)
+		self.flush_job = self.view_job = self.generate_job = None
+		if self.generation is not None:
+			self.generation.cancel()
+			self.generation = None
+		self.window.destroy()
+
+	def save(self, path=None):
+		"""Saves the game to a snapshot file, asking where when no path is given.
+
+		Games that are over, or whose bombs are not placed yet, are not saved.
+
+		Args:
+			path (str): Snapshot file.
+
+		Returns:
+			written (int): Pages written, None when nothing was saved.
+		"""
+		import Snapshot
+		if self.over or self.pending_bombs:
+			return None
+		if path is None:
+			path = filedialog.asksaveasfilename(parent=self.window, defaultextension=".snap", filetypes=[("Minesweeper save", "*.snap")])
+			if not path:
+				return None
+		return Snapshot.save(path, self.model, self.game, self.mode, self.time_limit, self.recorder.elapsed_ms(), self.recorder.events)
+
+	def remaining(self, now=None):
+		"""Seconds left, worked out from the real time since the board was built.
+
+		Args:
+			now (float): time.monotonic() to measure at, the current time when None.
+
+		Returns:
+			left (int): Whole seconds left, also the score a win now earns.
+		"""
+		if now is None:
+			now = time.monotonic()
+		return Replay.score_at(self.time_limit, self.recorder.elapsed_ms(now))
+
+	def show_time(self, left):
+		if left != self.shown:
+			self.shown = left
+			self.timer.configure(text="Score: " + str(left))
+
+	def tick(self, now):
+		"""Clock tick, updates the timer if it can be seen and ends the game at zero.
+
+		Args:
+			now (float): time.monotonic() of this tick.
+		"""
+		left = self.remaining(now)
+		if self.window.winfo_viewable():
+			self.show_time(left)
+		if left <= 0 and not self.check_game():
+			self.show_time(left)
+			self.game_over("lose")
+
+	def onObjectLeftClick(self, event):
+		"""Left click event onto a cell.
+
+		Handles the event of clicking onto a cell.
+
+		Args:
+			event (Event): Details of the event that triggered.
+		"""
+		t = Trace.now()
+		i = self.event_cell(event)
+		t = Trace.record(Trace.HIT_TEST, t)
+		if i is None or self.over or self.generation is not None:
+			return
+		self.recorder.record(Replay.REVEAL, i)
+		if self.pending_bombs:
+			self.place_no_guess(i)
+			return
+		self.reveal(*self.model.coords(i))
+		t = Trace.record(Trace.MODEL, t)
+		self.finish_move(t)
+
+	def finish_move(self, t):
+		"""Ends the game if the last reveal won it.
+
+		Args:
+			t (float): Trace.now() when the win check starts.
+		"""
+		won = self.check_game()
+		Trace.record(Trace.WIN_CHECK, t)
+		if won:
+			self.game_over("win")
+
+	def onObjectRightClick(self, event):
+		"""Right click event onto a cell.
+
+		Handles the event of right clicking onto a cell.
+
+		Args:
+			event (Event): Details of the event that triggered.
+		"""
+		t = Trace.now()
+		i = self.event_cell(event)
+		t = Trace.record(Trace.HIT_TEST, t)
+		# Nothing can be won before a no-guess board has its bombs.
+		if i is None or self.over or self.pending_bombs:
+			return
+		self.recorder.record(Replay.FLAG, i)
+		self.add_flag(*self.model.coords(i))
+		t = Trace.record(Trace.MODEL, t)
+		self.finish_move(t)
+
+	def onPointerMove(self, event):
+		"""Pointer moved or dragged over the canvas, highlights the cell under it.
+
+		Args:
+			event (Event): Details of the event that triggered.
+		"""
+		if not self.over:
+			self.set_hover(self.event_cell(event))
+
+	def onWheel(self, event):
+		"""Mouse wheel scrolls the view, with Shift sideways, with Control zooms.
+
+		Args:
+			event (Event): Details of the event that triggered.
+		"""
+		step = -1 if event.num == 4 or event.delta > 0 else 1
+		if event.state & 0x0004:
+			self.set_zoom(self.zoom * (1.25 if step < 0 else 0.8), event.x, event.y)
+		elif event.state & 0x0001:
+			self.canv.xview_scroll(step, "units")
+		else:
+			self.canv.yview_scroll(step, "units")
+
+	def set_zoom(self, zoom, anchor_x, anchor_y):
+		"""Rescales the drawing, keeping the point under the pointer in place.
+
+		Args:
+			zoom (float): New scale, clamped to MIN_ZOOM and MAX_ZOOM.
+			anchor_x (int): Pointer x position in the widget.
+			anchor_y (int): Pointer y position in the widget.
+		"""
+		zoom = max(MIN_ZOOM, min(MAX_ZOOM, zoom))
+		if zoom == self.zoom or self.over:
+			return
+		ux = self.canv.canvasx(anchor_x) / self.zoom
+		uy = self.canv.canvasy(anchor_y) / self.zoom
+		self.zoom = zoom
+		left, top, right, bottom = self.update_scrollregion()
+		self.canv.xview_moveto(max(0, ux*zoom - anchor_x - left) / (right - left))
+		self.canv.yview_moveto(max(0, uy*zoom - anchor_y - top) / (bottom - top))
+		font = self.font()
+		for i in self.items:
+			self.place(i)
+		for text in self.labels.values():
+			self.canv.itemconfig(text, font=font)
+		for text in self.label_pool:
+			self.canv.itemconfig(text, font=font)
+		self.refresh_view()
+
+	def font(self):
+		return "Times " + str(max(1, round(FONT_SIZE*self.zoom))) + " bold"
+
+	def update_scrollregion(self):
+		"""Sizes the scrollable area to the zoomed board.
+
+		Scrollbars are only shown while the board is larger than the canvas.
+
+		Returns:
+			region ((float, float, float, float)): Left, top, right and bottom
+				of the scrollable area in pixels.
+		"""
+		width = self.pitch*self.size_x*self.zoom
+		height = self.pitch*self.size_y*self.zoom
+		self.canv.configure(scrollregion=(0, 0, width, height))
+		if width > int(self.canv['width']):
+			self.xscroll.grid(row=2, columnspan=3, sticky="ew")
+		else:
+			self.xscroll.grid_remove()
+		if height > int(self.canv['height']):
+			self.yscroll.grid(row=1, column=3, sticky="ns")
+		else:
+			self.yscroll.grid_remove()
+		return 0, 0, width, height
+
+	def on_xscroll(self, first, last):
+		self.xscroll.set(first, last)
+		self.schedule_view()
+
+	def on_yscroll(self, first, last):
+		self.yscroll.set(first, last)
+		self.schedule_view()
+
+	def schedule_view(self):
+		if self.view_job is None and not self.over:
+			self.view_job = self.canv.after_idle(self.refresh_view)
+
+	def visible_range(self):
+		"""Cells inside the visible part of the canvas plus MARGIN.
+
+		Returns:
+			range ((int, int, int, int)): First and one past the last x and y.
+		"""
+		width = self.canv.winfo_width()
+		height = self.canv.winfo_height()
+		if width <= 1:
+			width = int(self.canv['width'])
+			height = int(self.canv['height'])
+		cell = 24 * self.zoom
+		left = self.canv.canvasx(0) / cell
+		top = self.canv.canvasy(0) / cell
+		right = self.canv.canvasx(width) / cell
+		bottom = self.canv.canvasy(height) / cell
+		return (max(0, int(left) - MARGIN), max(0, int(top) - MARGIN),
+			min(self.size_x, int(right) + 1 + MARGIN), min(self.size_y, int(bottom) + 1 + MARGIN))
+
+	def refresh_view(self):
+		"""Materialises the visible cells and releases the ones scrolled away."""
+		self.view_job = None
+		if self.over or not self.canv.winfo_exists():
+			return
+		x0, y0, x1, y1 = self.visible_range()
+		size_x = self.size_x
+		for i in [i for i in self.items if not (x0 <= i % size_x < x1 and y0 <= i // size_x < y1)]:
+			self.release(i)
+		for y in range(y0, y1):
+			for i in range(y*size_x + x0, y*size_x + x1):
+				if i not in self.items:
+					self.acquire(i)
+
+	def acquire(self, i):
+		"""Gives a cell a shape item, reusing a pooled one where possible.
+
+		Args:
+			i (int): Flat index of the cell.
+		"""
+		if self.pool:
+			rec = self.pool.pop()
+			self.canv.itemconfig(rec, state=tk.NORMAL)
+		else:
+			x, y = self.cell_coords(i)
+			rec = self.create_shape([c*self.zoom for c in self.shape_coords(x, y)])
+		self.items[i] = rec
+		self.place(i)
+		fill, label, label_fill = state = self.visual(i)
+		if i == self.hover:
+			self.canv.itemconfig(rec, fill=fill, outline=HOVER_OUTLINE, width=2)
+		else:
+			self.canv.itemconfig(rec, fill=fill, outline=OUTLINE, width=1)
+		if label:
+			self.canv.itemconfig(self.label(i), text=label, fill=label_fill)
+		self.drawn[i] = state
+
+	def release(self, i):
+		"""Hides a cell's canvas items and returns them to the pools.
+
+		Args:
+			i (int): Flat index of the cell.
+		"""
+		rec = self.items.pop(i)
+		del self.drawn[i]
+		self.canv.itemconfig(rec, state=tk.HIDDEN)
+		self.pool.append(rec)
+		self.drop_label(i)
+
+	def label(self, i):
+		"""Returns the text item of a cell, creating or reusing one on demand.
+
+		Args:
+			i (int): Flat index of a materialised cell.
+
+		Returns:
+			text (int): Canvas text item placed over the cell.
+		"""
+		text = self.labels.get(i)
+		if text is None:
+			x, y = self.cell_coords(i)
+			tx, ty = self.text_position(x, y)
+			if self.label_pool:
+				text = self.label_pool.pop()
+				self.canv.coords(text, tx*self.zoom, ty*self.zoom)
+				self.canv.itemconfig(text, state=tk.NORMAL)
+			else:
+				text = self.canv.create_text(tx*self.zoom, ty*self.zoom, fill="white", font=self.font(), text="", tags="rec")
+			self.labels[i] = text
+		return text
+
+	def drop_label(self, i):
+		"""Hides a cell's text item, if it has one, and pools it."""
+		text = self.labels.pop(i, None)
+		if text is not None:
+			self.canv.itemconfig(text, state=tk.HIDDEN)
+			self.label_pool.append(text)
+
+	def place(self, i):
+		"""Moves a cell's items to where the cell is drawn at the current zoom."""
+		x, y = self.cell_coords(i)
+		zoom = self.zoom
+		self.canv.coords(self.items[i], *[c*zoom for c in self.shape_coords(x, y)])
+		text = self.labels.get(i)
+		if text is not None:
+			tx, ty = self.text_position(x, y)
+			self.canv.coords(text, tx*zoom, ty*zoom)
+
+	def set_hover(self, i):
+		"""Moves the hover highlight onto a cell.
+
+		Args:
+			i (int): Flat index of the cell, None to clear the highlight.
+		"""
+		if i == self.hover or self.over:
+			return
+		if self.hover in self.items:
+			self.canv.itemconfig(self.items[self.hover], outline=OUTLINE, width=1)
+		if i in self.items:
+			self.canv.itemconfig(self.items[i], outline=HOVER_OUTLINE, width=2)
+		self.hover = i
+
+	def no_guess_supported(self):
+		import Generator
+		return Generator.supported(self.game, self.mode)
+
+	def show_notice(self, text):
+		"""Tells the player something about the board next to the bomb count."""
+		self.bomb_count.configure(text=self.bomb_count.cget("text") + " (" + text + ")")
+
+	def place_no_guess(self, first):
+		"""Starts generating the bombs of a no-guess game around the first click.
+
+		The search runs off the Tk thread, the board keeps drawing and the
+		first cell is revealed once poll_generation sees the result.
+
+		Args:
+			first (int): Flat index of the first cell revealed.
+		"""
+		import Generator
+		self.window.configure(cursor="watch")
+		self.generation = Generator.submit(self.model.topology, self.size_x, self.size_y, self.pending_bombs, first, seed=self.model.seed)
+		self.generate_job = self.canv.after(GENERATE_POLL, self.poll_generation, first)
+
+	def poll_generation(self, first):
+		"""Places the generated bombs and reveals the first click once ready.
+
+		Args:
+			first (int): Flat index of the first cell revealed.
+		"""
+		self.generate_job = None
+		if self.generation is None:
+			return
+		if not self.generation.done():
+			self.generate_job = self.canv.after(GENERATE_POLL, self.poll_generation, first)
+			return
+		import Generator
+		try:
+			bombs, verified = self.generation.result()
+		except Exception:
+			log.exception("No-guess generation failed")
+			bombs = Generator.draw(self.model.topology, self.size_x, self.size_y, self.pending_bombs, first, self.model.seed)
+			verified = False
+		self.generation = None
+		self.window.configure(cursor="")
+		if self.over:
+			return
+		t = Trace.now()
+		self.model.set_bombs(bombs)
+		self.pending_bombs = 0
+		if not verified:
+			self.show_notice("no no-guess board found in time, you may need to guess")
+		self.reveal(*self.model.coords(first))
+		t = Trace.record(Trace.MODEL, t)
+		self.finish_move(t)
+
+	def check_game(self):
+		if self.model.exploded:
+			return False
+		return self.model.check_game()
+
+	def game_over(self, status):
+		self.dirty.clear()
+		self.items.clear()
+		self.labels.clear()
+		self.drawn.clear()
+		self.pool = list()
+		self.label_pool = list()
+		self.hover = None
+		self.over = True
+		centre_x = self.canv.canvasx(int(self.canv['width'])//2)
+		centre_y = self.canv.canvasy(int(self.canv['height'])//2)
+		if status == "lose":
+			print("GAMEOVER")
+			self.canv.delete("all")
+			self.canv.create_text(centre_x, centre_y, fill="red",font="Times 20 italic bold", text="GAMEOVER")
+		elif status == "win":
+			print("You Win...")
+			self.canv.delete("all")
+			self.canv.create_text(centre_x, centre_y, fill="green",font="Times 20 italic bold", text="YOU WIN...")
+			score = self.remaining()
+			self.show_time(score)
+			name = simpledialog.askstring("Input", "What is your name?", parent=self.window)
+			if name is not None:
+				print("Storing score of: ", score, "By: ", name)
+				t = Trace.now()
+				self.scores.add((self.game, self.mode, name, self.size_x, self.size_y, len(self.model.bombs), score), self.recorder.finish(self.model))
+				Trace.record(Trace.DB_WRITE, t)
+
+	def add_flag(self, x, y):
+		"""Adds or removes a flag on the relevant cell.
+
+		Args:
+			x (int): x coordinate of Cell targeted.
+			y (int): y coordinate of Cell targeted.
+		"""
+		i = self.model.index(x, y)
+		if self.model.add_flag(i):
+			self.mark((i,))
+
+	def reveal(self, x, y):
+		"""Reveals a cell through the model and queues what changed for drawing.
+
+		Args:
+			x (int): x coordinate of Cell to be revealed.
+			y (int): y coordinate of Cell to be revealed.
+		"""
+		self.mark(self.model.reveal(self.model.index(x, y)))
+		if self.model.exploded:
+			self.game_over("lose")
+
+	def mark(self, cells):
+		"""Queues cells to be redrawn once the current event has been handled.
+
+		Args:
+			cells (int[]): Flat indices of the changed cells.
+		"""
+		self.dirty.update(cells)
+		if self.dirty and self.flush_job is None:
+			self.flush_job = self.canv.after_idle(self.flush)
+
+	def flush(self):
+		"""Draws every dirty cell on screen with one update per changed item.
+
+		Cells without canvas items are skipped, they are drawn from the model
+		when they scroll into view.
+		"""
+		self.flush_job = None
+		if not self.canv.winfo_exists():
+			return
+		t = Trace.now()
+		dirty = self.dirty
+		self.dirty = set()
+		items = self.items
+		for i in dirty:
+			if i in items:
+				self.paint(i)
+		Trace.record(Trace.FLUSH, t)
+
+	def visual(self, i):
+		"""Works out how a cell should look from the model state.
+
+		Args:
+			i (int): Flat index of the cell.
+
+		Returns:
+			visual ((str, str, str)): Fill, text and text colour.
+		"""
+		model = self.model
+		if model.flag[i]:
+			if self.show_flag_text:
+				return FLAG_FILL, 'F', FLAG_TEXT
+			return FLAG_FILL, '', 'white'
+		if model.colour[i]:
+			if self.show_numbers and model.number[i] > 0:
+				return self.palette[model.colour[i]], str(model.number[i]), 'black'
+			return self.palette[model.colour[i]], '', 'white'
+		return COVERED_FILL, '', 'white'
+
+	def paint(self, i):
+		"""Updates the canvas items of a cell, skipping unchanged items.
+
+		Args:
+			i (int): Flat index of a materialised cell.
+		"""
+		fill, text, text_fill = state = self.visual(i)
+		old = self.drawn[i]
+		if state == old:
+			return
+		if fill != old[0]:
+			self.canv.itemconfig(self.items[i], fill=fill)
+		if not text:
+			self.drop_label(i)
+		elif text != old[1] or text_fill != old[2]:
+			self.canv.itemconfig(self.label(i), text=text, fill=text_fill)
+		self.drawn[i] = state
+
+	def show_board(self):
+		return self.model.show_board()
+
+	def __str__(self):
+		return str(self.model)
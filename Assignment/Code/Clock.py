@@ -0,0 +1,63 @@
+"""One game clock shared by every open board.
+
+Boards register with the Clock owned by the App instead of running their own
+after() chains. A single timer wakes at the next whole second of whichever
+board changes soonest, and each board works out its time left from
+time.monotonic(), so the countdown and the score never drift with event loop
+lag however many windows are open.
+"""
+
+import time
+
+
+class Clock:
+	"""Clock ticks every registered board from one Tk timer.
+
+	Attributes:
+		root (Tk): Widget the timer is scheduled on.
+		boards (set): Boards still being timed.
+		job (str): Pending after() id, None while no board is registered.
+
+	"""
+	def __init__(self, root):
+		self.root = root
+		self.boards = set()
+		self.job = None
+
+	def add(self, board):
+		"""Starts timing a board until it is destroyed or its game ends.
+
+		Args:
+			board (BoardView): Board to tick.
+		"""
+		self.boards.add(board)
+		board.window.bind("<Destroy>", lambda event: self.remove(board) if event.widget is board.window else None, add="+")
+		self.tick()
+
+	def remove(self, board):
+		self.boards.discard(board)
+		if not self.boards and self.job is not None:
+			self.root.after_cancel(self.job)
+			self.job = None
+
+	def tick(self):
+		"""Updates every board and sleeps until the next one needs it."""
+		if self.job is not None:
+			self.root.after_cancel(self.job)
+			self.job = None
+		now = time.monotonic()
+		wake = None
+		for board in list(self.boards):
+			if board.over:
+				self.boards.discard(board)
+				continue
+			board.tick(now)
+			if board.over:
+				self.boards.discard(board)
+				continue
+			# Seconds until this board's time left next drops by one.
+			due = 1 - (now - board.recorder.started) % 1
+			if wake is None or due < wake:
+				wake = due
+		if wake is not None:
+			self.job = self.root.after(max(1, int(wake * 1000) + 1), self.tick)
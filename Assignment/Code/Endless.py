@@ -0,0 +1,241 @@
+"""Endless boards split into lazily generated chunks.
+
+The world has no edges. It is cut into CHUNK x CHUNK chunks whose mines are
+derived from the global seed and the chunk coordinates alone, so any chunk can
+be rebuilt identically at any time. A chunk's mine mask is only drawn when a
+chunk or one of its neighbours needs it (the halo used to count numbers), and
+its full cell state is only allocated once a reveal, flood fill or flag
+reaches it. Memory and startup therefore grow with the explored area.
+"""
+
+import random
+from collections import deque
+
+from Topology import SQUARE, offsets, count_neighbours
+
+# Side of a chunk in cells. Even, so hex column parity is the same in every
+# chunk.
+CHUNK = 32
+# Padding around a chunk when counting numbers. Two columns keep the hex
+# column parity of the padded grid equal to the global one.
+PAD = 2
+# Most cells one reveal opens, an open region can be unbounded.
+REVEAL_LIMIT = 20000
+
+
+class Chunk:
+	"""Chunk stores the state of CHUNK x CHUNK cells.
+
+	Attributes:
+		bomb (bytearray): 1 where the cell contains a bomb.
+		covered (bytearray): 1 where the cell is still covered from the user.
+		flag (bytearray): 1 where the cell is marked with a flag.
+		number (bytearray): The number of neighbouring bombs.
+
+	"""
+	__slots__ = ("bomb", "covered", "flag", "number")
+
+	def __init__(self, bomb, number):
+		self.bomb = bomb
+		self.covered = bytearray(b"\x01") * (CHUNK*CHUNK)
+		self.flag = bytearray(CHUNK*CHUNK)
+		self.number = number
+
+
+class ChunkedModel:
+	"""ChunkedModel plays Minesweeper on an endless board.
+
+	Cells are addressed by global x and y coordinates, which may be negative.
+	An endless game cannot be won: it goes on until a mine is revealed, and
+	is scored by how many safe cells were revealed before that.
+
+	Attributes:
+		seed (int): Global seed every chunk's mines are derived from.
+		topology (str): Either SQUARE or HEX.
+		bombs_per_chunk (int): Mines placed in every chunk.
+		chunks (dict): Generated chunks keyed by chunk coordinates.
+		masks (dict): Mine masks keyed by chunk coordinates, a superset of
+			chunks that also covers their halo.
+		flag_count (int): How many flags are on the board.
+		revealed (int): How many safe cells have been revealed.
+		exploded (bool): Set once a move has lost the game.
+
+	"""
+	def __init__(self, seed, bombs_per_chunk, topology=SQUARE):
+		"""ChunkedModel setup.
+
+		Nothing is generated until the first move.
+
+		Args:
+			seed (int): Global seed.
+			bombs_per_chunk (int): Mines placed in every chunk.
+			topology (str): Neighbourhood used for counting and revealing.
+		"""
+		self.seed = seed
+		self.topology = topology
+		self.bombs_per_chunk = bombs_per_chunk
+		self.chunks = dict()
+		self.masks = dict()
+		self.flag_count = 0
+		self.revealed = 0
+		self.exploded = False
+
+	def mask(self, cx, cy):
+		"""Mine mask of a chunk, drawn from the seed and chunk coordinates.
+
+		Args:
+			cx (int): Chunk x coordinate.
+			cy (int): Chunk y coordinate.
+
+		Returns:
+			mask (bytearray): 1 where the cell contains a bomb.
+		"""
+		key = (cx, cy)
+		mask = self.masks.get(key)
+		if mask is None:
+			rng = random.Random("{}:{}:{}".format(self.seed, cx, cy))
+			mask = bytearray(CHUNK*CHUNK)
+			for i in rng.sample(range(CHUNK*CHUNK), self.bombs_per_chunk):
+				mask[i] = 1
+			self.masks[key] = mask
+		return mask
+
+	def chunk(self, cx, cy):
+		"""Returns a chunk, generating it on first use.
+
+		Numbers are counted on the chunk padded with PAD cells of its
+		neighbours' mines.
+
+		Args:
+			cx (int): Chunk x coordinate.
+			cy (int): Chunk y coordinate.
+
+		Returns:
+			chunk (Chunk): The chunk at those coordinates.
+		"""
+		key = (cx, cy)
+		chunk = self.chunks.get(key)
+		if chunk is not None:
+			return chunk
+		side = CHUNK + 2*PAD
+		padded = bytearray(side*side)
+		for ny in (-1, 0, 1):
+			for nx in (-1, 0, 1):
+				mask = self.mask(cx+nx, cy+ny)
+				x0 = max(0, PAD + nx*CHUNK)
+				x1 = min(side, PAD + (nx+1)*CHUNK)
+				lx = x0 - PAD - nx*CHUNK
+				for y in range(max(0, PAD + ny*CHUNK), min(side, PAD + (ny+1)*CHUNK)):
+					ly = y - PAD - ny*CHUNK
+					padded[y*side + x0:y*side + x1] = mask[ly*CHUNK + lx:ly*CHUNK + lx + x1 - x0]
+		counts = count_neighbours(padded, self.topology, side, side)
+		number = bytearray(CHUNK*CHUNK)
+		for y in range(CHUNK):
+			row = (y+PAD)*side + PAD
+			number[y*CHUNK:(y+1)*CHUNK] = counts[row:row+CHUNK]
+		chunk = Chunk(self.mask(cx, cy), number)
+		self.chunks[key] = chunk
+		return chunk
+
+	def cell(self, x, y):
+		"""Locates a global cell.
+
+		Returns:
+			cell ((Chunk, int)): The chunk holding the cell and its index in it.
+		"""
+		return self.chunk(x // CHUNK, y // CHUNK), (y % CHUNK)*CHUNK + x % CHUNK
+
+	def add_flag(self, x, y):
+		"""Toggles the flag on a covered cell.
+
+		Returns:
+			True if the flag changed, False otherwise.
+		"""
+		chunk, i = self.cell(x, y)
+		if not chunk.covered[i]:
+			return False
+		chunk.flag[i] ^= 1
+		self.flag_count += 1 if chunk.flag[i] else -1
+		return True
+
+	def reveal(self, x, y, limit=REVEAL_LIMIT):
+		"""Reveals a cell and flood fills outwards from zero cells.
+
+		Chunks are generated as the fill reaches them. An open region can be
+		unbounded at low densities, so the fill stops opening the neighbours
+		of zero cells once limit cells have been revealed. The zero cells it
+		stopped at stay next to covered cells, and revealing one of them
+		again carries the fill on from there.
+
+		Args:
+			x (int): Global x coordinate.
+			y (int): Global y coordinate.
+			limit (int): Cells after which the fill stops spreading.
+
+		Returns:
+			changed ((int, int)[]): Global coordinates of the revealed cells.
+		"""
+		changed = list()
+		chunk, i = self.cell(x, y)
+		if chunk.flag[i]:
+			return changed
+		if chunk.covered[i]:
+			if chunk.bomb[i]:
+				self.exploded = True
+				return changed
+			chunk.covered[i] = 0
+			changed.append((x, y))
+		elif chunk.number[i]:
+			return changed
+		queue = deque(((x, y, chunk, i),))
+		while queue and len(changed) < limit:
+			x, y, chunk, i = queue.popleft()
+			if chunk.number[i]:
+				continue
+			for dx, dy in offsets(self.topology, x):
+				nx, ny = x+dx, y+dy
+				chunk, i = self.cell(nx, ny)
+				if chunk.covered[i] and not chunk.flag[i]:
+					chunk.covered[i] = 0
+					changed.append((nx, ny))
+					queue.append((nx, ny, chunk, i))
+		self.revealed += len(changed)
+		return changed
+
+	def find(self, x, y):
+		"""Locates a global cell without generating its chunk.
+
+		Returns:
+			cell ((Chunk, int)): The chunk holding the cell and its index in
+				it, None if the chunk has not been generated.
+		"""
+		chunk = self.chunks.get((x // CHUNK, y // CHUNK))
+		if chunk is None:
+			return None
+		return chunk, (y % CHUNK)*CHUNK + x % CHUNK
+
+	def is_covered(self, x, y):
+		cell = self.find(x, y)
+		return cell is None or bool(cell[0].covered[cell[1]])
+
+	def number_at(self, x, y):
+		chunk, i = self.cell(x, y)
+		return chunk.number[i]
+
+	def show_region(self, x0, y0, x1, y1):
+		"""Shows the revealed state of a rectangle for debugging.
+
+		Returns:
+			output (str): Region view in the same style as Model.__str__.
+		"""
+		output = ""
+		for y in range(y0, y1):
+			for x in range(x0, x1):
+				if self.is_covered(x, y):
+					output += "|█|"
+				elif self.number_at(x, y) > 0:
+					output += "|" + str(self.number_at(x, y)) + "|"
+				else:
+					output += "| |"
+			output += "\n"
+		return output
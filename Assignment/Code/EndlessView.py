@@ -0,0 +1,195 @@
+import math
+import random
+import tkinter as tk
+from tkinter import simpledialog
+
+import Engine
+import Trace
+from BoardView import BoardView, COVERED_FILL, FLAG_FILL, FLAG_TEXT, MARGIN, VIEW_SIZE
+from Endless import CHUNK, ChunkedModel
+
+# Chunks of scrollable space kept beyond the visible area in every direction.
+EXTENT = 2
+
+
+class EndlessView(BoardView):
+	"""EndlessView draws an endless ChunkedModel through the BoardView viewport.
+
+	Canvas items are keyed by global (x, y) cells instead of flat indices.
+	The scrollable area starts a few chunks around the origin and grows by
+	whole chunks as the view nears its edge, so the player can scroll as far
+	as they like while only the visible cells have items. Chunks are only
+	generated by moves, drawing a cell in an untouched chunk shows it covered.
+
+	Games are untimed and never won. They end on the first mine and score the
+	safe cells revealed before it. A click opens at most Endless.REVEAL_LIMIT
+	cells, clicking a blank cell at the edge of the opened area opens more.
+
+	Attributes:
+		model (ChunkedModel): The headless game state.
+		bounds ((int, int, int, int)): Scrollable area in cells, left, top,
+			right and bottom.
+
+	"""
+	def __init__(self, root, bombs_per_chunk, mode, scores, seed=None):
+		"""Endless board setup.
+
+		Args:
+			root (Panel): Where the Canvas should be created.
+			bombs_per_chunk (int): Mines in every CHUNK x CHUNK chunk.
+			mode (str): Level name stored with the high scores.
+			scores (ScoreWriter): Where the final score is saved.
+			seed (int): Seed every chunk is drawn from, random when None.
+		"""
+		self.window = root
+		self.window.configure(background='#BDC3C7')
+		self.mode = mode
+		self.scores = scores
+		self.model = ChunkedModel(random.getrandbits(64) if seed is None else seed, bombs_per_chunk, self.topology)
+		self.pending_bombs = 0
+
+		self.shown = None
+		self.timer = tk.Label(root, text="", background='#BDC3C7')
+		quitButton = tk.Button(root, text="Quit", background='#BDC3C7', command=lambda: self.quit())
+		self.bomb_count = tk.Label(root, text="Bombs: " + str(bombs_per_chunk) + " per chunk", background='#BDC3C7')
+		quitButton.grid(row=0, column=1)
+		self.timer.grid(row=0, column=2)
+		self.bomb_count.grid(row=0, column=0)
+
+		self.build_view(VIEW_SIZE, VIEW_SIZE)
+		self.bounds = (-EXTENT*CHUNK, -EXTENT*CHUNK, EXTENT*CHUNK, EXTENT*CHUNK)
+		left, top, right, bottom = self.update_scrollregion()
+		# Open with the origin in the middle of the view.
+		self.canv.xview_moveto((-VIEW_SIZE/2 - left) / (right - left))
+		self.canv.yview_moveto((-VIEW_SIZE/2 - top) / (bottom - top))
+		self.show_revealed()
+		self.refresh_view()
+
+	def cell_coords(self, cell):
+		return cell
+
+	def event_cell(self, event):
+		"""Hit tests a mouse event, every point between cells is on the board.
+
+		Returns:
+			cell ((int, int)): Global x and y coordinate, None if the point is
+				between cells.
+		"""
+		return self.cell_at(self.canv.canvasx(event.x) / self.zoom, self.canv.canvasy(event.y) / self.zoom)
+
+	def show_revealed(self):
+		revealed = self.model.revealed
+		if revealed != self.shown:
+			self.shown = revealed
+			self.timer.configure(text="Revealed: " + str(revealed))
+
+	def onObjectLeftClick(self, event):
+		t = Trace.now()
+		cell = self.event_cell(event)
+		t = Trace.record(Trace.HIT_TEST, t)
+		if cell is None or self.over:
+			return
+		x, y = cell
+		self.mark(self.model.reveal(x, y))
+		self.show_revealed()
+		Trace.record(Trace.MODEL, t)
+		if self.model.exploded:
+			self.game_over("lose")
+
+	def onObjectRightClick(self, event):
+		t = Trace.now()
+		cell = self.event_cell(event)
+		t = Trace.record(Trace.HIT_TEST, t)
+		if cell is None or self.over:
+			return
+		if self.model.add_flag(*cell):
+			self.mark((cell,))
+		Trace.record(Trace.MODEL, t)
+
+	def update_scrollregion(self):
+		"""Sizes the scrollable area to the bounds at the current zoom.
+
+		Returns:
+			region ((float, float, float, float)): Left, top, right and bottom
+				of the scrollable area in pixels.
+		"""
+		scale = self.pitch * self.zoom
+		region = tuple(c*scale for c in self.bounds)
+		self.canv.configure(scrollregion=region)
+		self.xscroll.grid(row=2, columnspan=3, sticky="ew")
+		self.yscroll.grid(row=1, column=3, sticky="ns")
+		return region
+
+	def extend(self, x0, y0, x1, y1):
+		"""Grows the scrollable area so EXTENT chunks lie past a range of cells."""
+		left, top, right, bottom = self.bounds
+		bounds = (min(left, (x0 // CHUNK - EXTENT) * CHUNK), min(top, (y0 // CHUNK - EXTENT) * CHUNK),
+			max(right, (x1 // CHUNK + EXTENT + 1) * CHUNK), max(bottom, (y1 // CHUNK + EXTENT + 1) * CHUNK))
+		if bounds != self.bounds:
+			self.bounds = bounds
+			self.update_scrollregion()
+
+	def visible_range(self):
+		"""Cells inside the visible part of the canvas plus MARGIN, unclipped.
+
+		Returns:
+			range ((int, int, int, int)): First and one past the last x and y.
+		"""
+		width = self.canv.winfo_width()
+		height = self.canv.winfo_height()
+		if width <= 1:
+			width = int(self.canv['width'])
+			height = int(self.canv['height'])
+		cell = 24 * self.zoom
+		return (math.floor(self.canv.canvasx(0) / cell) - MARGIN, math.floor(self.canv.canvasy(0) / cell) - MARGIN,
+			math.floor(self.canv.canvasx(width) / cell) + 1 + MARGIN, math.floor(self.canv.canvasy(height) / cell) + 1 + MARGIN)
+
+	def refresh_view(self):
+		"""Materialises the visible cells and releases the ones scrolled away."""
+		self.view_job = None
+		if self.over or not self.canv.winfo_exists():
+			return
+		x0, y0, x1, y1 = self.visible_range()
+		self.extend(x0, y0, x1, y1)
+		for cell in [cell for cell in self.items if not (x0 <= cell[0] < x1 and y0 <= cell[1] < y1)]:
+			self.release(cell)
+		for y in range(y0, y1):
+			for x in range(x0, x1):
+				if (x, y) not in self.items:
+					self.acquire((x, y))
+
+	def visual(self, cell):
+		"""Works out how a cell should look without generating its chunk.
+
+		Args:
+			cell ((int, int)): Global x and y coordinate.
+
+		Returns:
+			visual ((str, str, str)): Fill, text and text colour.
+		"""
+		found = self.model.find(*cell)
+		if found is None:
+			return COVERED_FILL, '', 'white'
+		chunk, i = found
+		if chunk.flag[i]:
+			if self.show_flag_text:
+				return FLAG_FILL, 'F', FLAG_TEXT
+			return FLAG_FILL, '', 'white'
+		if chunk.covered[i]:
+			return COVERED_FILL, '', 'white'
+		number = chunk.number[i]
+		fill = self.palette[Engine.COLOUR_CLASSES[number]]
+		if self.show_numbers and number > 0:
+			return fill, str(number), 'black'
+		return fill, '', 'white'
+
+	def game_over(self, status):
+		"""Ends the game and saves the cells revealed as the score."""
+		BoardView.game_over(self, status)
+		score = self.model.revealed
+		name = simpledialog.askstring("Input", "Revealed " + str(score) + " cells. What is your name?", parent=self.window)
+		if name is not None:
+			print("Storing score of: ", score, "By: ", name)
+			t = Trace.now()
+			self.scores.add((self.game, self.mode, name, 0, 0, self.model.bombs_per_chunk, score))
+			Trace.record(Trace.DB_WRITE, t)
@@ -0,0 +1,576 @@
+"""Headless game model shared by every Minesweeper mode.
+
+The model keeps all per-cell state in compact parallel arrays keyed by a flat
+cell index (``index = y * size_x + x``) so the game logic can run without a
+Tk canvas, in worker processes, and on very large boards.
+
+Boards are reproducible from their seed, and can be saved in a compact binary
+format: a fixed header followed by the mine mask packed eight cells to a
+byte, see dumps and loads.
+"""
+
+import random
+import struct
+from collections import deque
+from itertools import compress
+
+from Topology import SQUARE, HEX, neighbour_rows, count_neighbours
+
+# Level table used by the Game menu: (size_x, size_y, bombs, time) per level.
+PRESETS = {
+	"normal": {
+		'Easy': (10, 10, 8, 120),
+		'Medium': (20, 20, 30, 300),
+		'Hard': (30, 30, 100, 600),
+		'Super Hard': (30, 30, 200, 600),
+	},
+	"hex": {
+		'Easy': (15, 15, 10, 120),
+		'Medium': (20, 20, 30, 300),
+		'Hard': (30, 30, 100, 600),
+		'Super Hard': (30, 30, 200, 600),
+	},
+	"colour": {
+		'Easy': (10, 10, 15, 120),
+		'Medium': (20, 20, 30, 300),
+		'Hard': (30, 30, 100, 600),
+		'Super Hard': (30, 30, 200, 600),
+	},
+}
+
+# Board file header: magic, format version, topology tag, size_x, size_y,
+# mine count and seed. The mine mask follows, cell 0 in the top bit of the
+# first byte.
+MAGIC = b"MSWP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sBBIIIQ")
+TOPOLOGY_TAGS = {SQUARE: 0, HEX: 1}
+TAG_TOPOLOGIES = {tag: topology for topology, tag in TOPOLOGY_TAGS.items()}
+# Translations between one byte per cell and ASCII binary digits.
+CELLS_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+DIGITS_TO_CELLS = bytes.maketrans(b"01", b"\x00\x01")
+
+# Colour classes stored in Model.colour. Views map these onto real colours.
+UNPAINTED = 0
+BOMB_COLOUR = 6
+
+
+def colour_class(number):
+	"""Maps a neighbour count onto the colour class painted when revealed.
+
+	Args:
+		number (int): The number of neighbouring bombs.
+
+	Returns:
+		colour (int): Colour class between 1 and 5.
+	"""
+	return min(number, 4) + 1
+
+
+# colour_class of every possible number, for use inside hot loops.
+COLOUR_CLASSES = bytes(colour_class(n) for n in range(256))
+
+
+class Model:
+	"""Model stores the state of every cell in parallel arrays.
+
+	Attributes:
+		size_x (int): The size of how many cells there should be in a column.
+		size_y (int): The size of how many cells there should be in a row.
+		size (int): Total number of cells.
+		topology (str): Either SQUARE or HEX.
+		seed (int): Seed place_bombs draws from, 64 bits.
+		bomb (bytearray): 1 where the cell contains a bomb.
+		covered (bytearray): 1 where the cell is still covered from the user.
+		flag (bytearray): 1 where the cell is marked with a flag.
+		number (bytearray): The number of neighbouring bombs.
+		colour (bytearray): Colour class painted onto the cell.
+		bombs (int[]): Flat indices of the bombs locations.
+		flag_count (int): How many flags are on the board.
+		revealed (int): How many safe cells have been revealed.
+		flags_correct (int): Flags placed on bombs.
+		flags_wrong (int): Flags placed on safe cells.
+		safe_covered (int): Safe cells still covered.
+		exploded (bool): Set once a move has lost the game.
+		validate (bool): Cross-check the counters against a full scan on
+			every check_game call, for tests.
+		rows (list): Neighbour offsets per row and column shared by boards
+			of this shape, see Topology.neighbour_rows.
+
+	"""
+	def __init__(self, size_x, size_y, topology=SQUARE, validate=False, seed=None, columns=None):
+		"""Model setup.
+
+		Every cell starts covered, without a bomb, flag or colour, unless
+		existing columns are given.
+
+		Args:
+			size_x (int): The size of how many cells there should be in a column.
+			size_y (int): The size of how many cells there should be in a row.
+			topology (str): Neighbourhood used for counting and revealing.
+			validate (bool): Cross-check the win counters on every check.
+			seed (int): Seed for place_bombs, a random one when None.
+			columns (dict): Writable buffers to use as the bomb, covered,
+				flag, number and colour arrays, and the bombs list, instead
+				of new ones. The counters are left for the caller to set.
+				See Snapshot.
+		"""
+		self.size_x = size_x
+		self.size_y = size_y
+		self.size = size_x * size_y
+		self.topology = topology
+		self.seed = random.getrandbits(64) if seed is None else seed
+		if columns is None:
+			self.bomb = bytearray(self.size)
+			self.covered = bytearray(b"\x01") * self.size
+			self.flag = bytearray(self.size)
+			self.number = bytearray(self.size)
+			self.colour = bytearray(self.size)
+			self.bombs = list()
+		else:
+			self.bomb = columns["bomb"]
+			self.covered = columns["covered"]
+			self.flag = columns["flag"]
+			self.number = columns["number"]
+			self.colour = columns["colour"]
+			self.bombs = columns["bombs"]
+		self.flag_count = 0
+		self.revealed = 0
+		self.flags_correct = 0
+		self.flags_wrong = 0
+		self.safe_covered = self.size
+		self.exploded = False
+		self.validate = validate
+		self.rows = neighbour_rows(topology, size_x, size_y)
+
+	def index(self, x, y):
+		return y * self.size_x + x
+
+	def coords(self, i):
+		return i % self.size_x, i // self.size_x
+
+	def neighbours(self, i):
+		"""Lists the flat indices of every neighbour of a cell.
+
+		Args:
+			i (int): Flat index of the cell.
+
+		Returns:
+			neighbours (int[]): Indices of the neighbours inside the board.
+		"""
+		return [i + d for d in self.rows[i // self.size_x][i % self.size_x]]
+
+	def place_bombs(self, bombs):
+		"""Places bombs on random cells drawn from the model's seed.
+
+		Samples distinct cells without replacement, so the cost only depends
+		on the amount of bombs and not on how dense the board is. The same
+		seed, size and bomb count always give the same board.
+
+		Args:
+			bombs (int): amount of bombs to place
+		"""
+		self.set_bombs(random.Random(self.seed).sample(range(self.size), bombs))
+
+	def from_seed(self):
+		"""Whether place_bombs with the model's seed gives back its bombs.
+
+		No-guess boards are set directly and their seed does not reproduce
+		them, so only boards where this holds should show their seed.
+
+		Returns:
+			reproducible (bool): True when the bombs were drawn from the seed.
+		"""
+		if not self.bombs:
+			return False
+		return sorted(random.Random(self.seed).sample(range(self.size), len(self.bombs))) == sorted(self.bombs)
+
+	def set_bombs(self, bombs):
+		"""Places bombs on the given cells and counts every cell's number.
+
+		Args:
+			bombs (int[]): Flat indices of distinct cells.
+		"""
+		for i in bombs:
+			self.bomb[i] = 1
+		self.bombs = list(bombs)
+		self.recount()
+
+	def set_mask(self, mask):
+		"""Places bombs from a mask of one byte per cell, 1 for a bomb.
+
+		Args:
+			mask (bytes): Mask covering every cell.
+		"""
+		bomb = self.bomb
+		bomb[:] = mask
+		if bomb.count(1) * 12 < self.size:
+			# Sparse masks are quicker to search than to walk cell by cell.
+			bombs = list()
+			find = bomb.find
+			i = find(1)
+			while i >= 0:
+				bombs.append(i)
+				i = find(1, i + 1)
+			self.bombs = bombs
+		else:
+			self.bombs = list(compress(range(self.size), bomb))
+		self.recount()
+
+	def recount(self):
+		"""Counts every cell's number and the win counters after bombs moved."""
+		self.count_numbers()
+		self.safe_covered = self.size - len(self.bombs) - self.revealed
+		# Boards are usually loaded or set up before any flag is placed.
+		self.flags_correct = sum(self.flag[i] for i in self.bombs) if self.flag_count else 0
+		self.flags_wrong = self.flag_count - self.flags_correct
+
+	def count_numbers(self):
+		"""Counts the neighbouring bombs of every cell in one pass."""
+		self.number[:] = count_neighbours(self.bomb, self.topology, self.size_x, self.size_y)
+
+	def add_flag(self, i):
+		"""Toggles the flag on a covered cell.
+
+		Args:
+			i (int): Flat index of the cell targeted.
+
+		Returns:
+			True if the flag changed, False otherwise.
+		"""
+		if not self.covered[i]:
+			return False
+		step = -1 if self.flag[i] else 1
+		self.flag[i] ^= 1
+		self.flag_count += step
+		if self.bomb[i]:
+			self.flags_correct += step
+		else:
+			self.flags_wrong += step
+		return True
+
+	def reveal(self, i):
+		"""Reveals a cell and flood fills outwards from zero cells.
+
+		The fill is a breadth first search over an explicit queue. A cell is
+		uncovered as it is queued so the covered array doubles as the visited
+		bitmap, keeping memory bounded by the fill frontier rather than the
+		call stack.
+
+		Args:
+			i (int): Flat index of the cell to be revealed.
+
+		Returns:
+			changed (int[]): Indices of the newly revealed cells.
+		"""
+		changed = list()
+		if self.flag[i] or not self.covered[i]:
+			return changed
+		if self.bomb[i]:
+			self.exploded = True
+			return changed
+		covered = self.covered
+		flag = self.flag
+		number = self.number
+		colour = self.colour
+		rows = self.rows
+		size_x = self.size_x
+		classes = COLOUR_CLASSES
+		covered[i] = 0
+		queue = deque((i,))
+		while queue:
+			c = queue.popleft()
+			colour[c] = classes[number[c]]
+			changed.append(c)
+			if number[c] == 0:
+				for d in rows[c // size_x][c % size_x]:
+					n = c + d
+					if covered[n] and not flag[n]:
+						covered[n] = 0
+						queue.append(n)
+		self.revealed += len(changed)
+		self.safe_covered -= len(changed)
+		return changed
+
+	def check_game(self):
+		"""Checks if game state is complete in constant time.
+
+		The game is won once every safe cell is revealed, or once every bomb
+		is flagged with no extra flags, read off counters kept up to date by
+		each move. A board without bombs is never won.
+
+		Returns:
+			True if complete, False otherwise.
+		"""
+		if self.validate:
+			self.check_counters()
+		# A board without bombs, such as a no-guess board before its first
+		# click, has nothing to win.
+		if not self.bombs:
+			return False
+		if self.safe_covered == 0:
+			return True
+		return self.flags_correct == len(self.bombs) and self.flags_wrong == 0
+
+	def check_counters(self):
+		"""Recounts the win counters with a full scan of the board.
+
+		Raises:
+			AssertionError: If a counter disagrees with the scan.
+		"""
+		flags = bytes(self.flag)
+		correct = sum(self.flag[i] for i in self.bombs)
+		counts = {
+			"flag_count": flags.count(1),
+			"flags_correct": correct,
+			"flags_wrong": flags.count(1) - correct,
+			"safe_covered": bytes(self.covered).count(1) - len(self.bombs),
+			"revealed": bytes(self.covered).count(0),
+		}
+		for name, expected in counts.items():
+			if getattr(self, name) != expected:
+				raise AssertionError("{} is {} but the board has {}".format(name, getattr(self, name), expected))
+
+	def show_board(self):
+		"""Shows board state for debugging.
+
+		Returns:
+			output (str): Board view.
+		"""
+		output = ""
+		for y in range(self.size_y):
+			for x in range(self.size_x):
+				i = y * self.size_x + x
+				if self.bomb[i]:
+					output += "|B|"
+				elif self.number[i] > 0:
+					output += "|" + str(self.number[i]) + "|"
+				else:
+					output += "| |"
+			output += "\n"
+		return output
+
+	def __str__(self):
+		output = ""
+		for y in range(self.size_y):
+			for x in range(self.size_x):
+				i = y * self.size_x + x
+				if self.covered[i]:
+					output += "|█|"
+				elif self.bomb[i]:
+					output += "|B|"
+				elif self.number[i] > 0:
+					output += "|" + str(self.number[i]) + "|"
+				else:
+					output += "| |"
+			output += "\n"
+		return output
+
+
+def pack_mask(bomb):
+	"""Packs one byte per cell into one bit per cell.
+
+	The cells are read as the binary digits of one integer, so both
+	directions run in C over the whole board.
+
+	Args:
+		bomb (bytes): 1 where the cell contains a bomb, one byte per cell.
+
+	Returns:
+		mask (bytes): Cell 0 in the top bit of the first byte, zero padded.
+	"""
+	digits = bytes(bomb).translate(CELLS_TO_DIGITS) + b"0" * (-len(bomb) % 8)
+	return int(digits, 2).to_bytes(len(digits) // 8, 'big')
+
+
+def unpack_mask(mask, size):
+	"""Unpacks a bit per cell mask into one byte per cell.
+
+	Args:
+		mask (bytes): Packed mask, any bytes-like object.
+		size (int): Number of cells.
+
+	Returns:
+		bomb (bytes): 1 where the cell contains a bomb.
+	"""
+	digits = format(int.from_bytes(mask, 'big'), 'b').zfill(len(mask) * 8)
+	return digits.encode()[:size].translate(DIGITS_TO_CELLS)
+
+
+def dumps(model):
+	"""Saves the mine layout of a board.
+
+	Args:
+		model (Model): Board with its bombs placed.
+
+	Returns:
+		data (bytearray): Header followed by the packed mine mask.
+	"""
+	mask = pack_mask(model.bomb)
+	data = bytearray(HEADER.size + len(mask))
+	HEADER.pack_into(data, 0, MAGIC, FORMAT_VERSION, TOPOLOGY_TAGS[model.topology], model.size_x, model.size_y, len(model.bombs), model.seed)
+	memoryview(data)[HEADER.size:] = mask
+	return data
+
+
+def parse(data):
+	"""Reads a saved board without copying it.
+
+	Args:
+		data (bytes): Saved board, any bytes-like object.
+
+	Returns:
+		board ((str, int, int, int, int, memoryview)): Topology, size_x,
+			size_y, mine count, seed, and a view of the packed mask.
+
+	Raises:
+		ValueError: If the data is not a board this version can read.
+	"""
+	view = memoryview(data)
+	if len(view) < HEADER.size:
+		raise ValueError("board data is too short for its header")
+	magic, version, tag, size_x, size_y, mines, seed = HEADER.unpack_from(view)
+	if magic != MAGIC or version != FORMAT_VERSION or tag not in TAG_TOPOLOGIES:
+		raise ValueError("not a version {} board".format(FORMAT_VERSION))
+	length = (size_x * size_y + 7) // 8
+	if len(view) != HEADER.size + length:
+		raise ValueError("board mask should be {} bytes".format(length))
+	return TAG_TOPOLOGIES[tag], size_x, size_y, mines, seed, view[HEADER.size:]
+
+
+def loads(data, model_class=None, validate=False):
+	"""Builds a board from saved data.
+
+	Args:
+		data (bytes): Saved board, any bytes-like object.
+		model_class (type): Model or a subclass, Model when None.
+		validate (bool): Passed on to the model.
+
+	Returns:
+		model (Model): Board with its bombs placed and numbers counted.
+
+	Raises:
+		ValueError: If the data is malformed or the mine count is wrong.
+	"""
+	topology, size_x, size_y, mines, seed, mask = parse(data)
+	model = (model_class or Model)(size_x, size_y, topology, validate, seed)
+	model.set_mask(unpack_mask(mask, model.size))
+	if len(model.bombs) != mines:
+		raise ValueError("header says {} mines but the mask has {}".format(mines, len(model.bombs)))
+	return model
+
+
+class ColourModel(Model):
+	"""Model for the colour game on a hex board.
+
+	Revealing a cell paints it with the colour class of its number, bombs are
+	painted too. The game is lost when a cell is painted next to a cell of the
+	same colour. Zero cells do not flood fill.
+
+	Conflicts are answered from an adjacency index updated on every paint:
+	for each colour class, how many painted neighbours of that colour every
+	cell has. The cells that would conflict if revealed now are kept in a set
+	alongside it.
+
+	Attributes:
+		adjacent (bytearray[]): Per colour class, the count of neighbours
+			painted that colour for every cell.
+		hazards (set): Unpainted cells whose own colour is already painted
+			next to them.
+
+	"""
+	def __init__(self, size_x, size_y, topology=HEX, validate=False, seed=None, columns=None):
+		Model.__init__(self, size_x, size_y, topology, validate, seed, columns)
+		self.adjacent = [bytearray(self.size) for _ in range(BOMB_COLOUR + 1)]
+		self.hazards = set()
+		if columns is not None:
+			self.reindex()
+
+	def reindex(self):
+		"""Rebuilds the adjacency index from the colours already painted."""
+		painted = [(i, self.colour[i]) for i in compress(range(self.size), self.colour)]
+		for i, _ in painted:
+			self.colour[i] = UNPAINTED
+		for i, colour in painted:
+			self.paint(i, colour)
+
+	def future_colour(self, i):
+		"""Colour class a cell will be painted when revealed."""
+		if self.bomb[i]:
+			return BOMB_COLOUR
+		return COLOUR_CLASSES[self.number[i]]
+
+	def paint(self, i, colour):
+		"""Paints a cell and updates the adjacency index around it.
+
+		Args:
+			i (int): Flat index of the cell.
+			colour (int): Colour class to paint.
+		"""
+		if self.colour[i] == colour:
+			return
+		self.colour[i] = colour
+		self.hazards.discard(i)
+		counts = self.adjacent[colour]
+		painted = self.colour
+		for n in self.neighbours(i):
+			counts[n] += 1
+			if counts[n] == 1 and not painted[n] and self.future_colour(n) == colour:
+				self.hazards.add(n)
+
+	def conflicts(self, i):
+		"""Checks if a painted cell touches a cell of the same colour.
+
+		Args:
+			i (int): Flat index of the painted cell.
+
+		Returns:
+			True if a neighbour has the same colour, False otherwise.
+		"""
+		return self.adjacent[self.colour[i]][i] > 0
+
+	def would_conflict(self, i):
+		"""Checks if revealing a cell now would lose the game.
+
+		Args:
+			i (int): Flat index of the cell.
+
+		Returns:
+			True if a neighbour is painted the colour the cell would get.
+		"""
+		return self.adjacent[self.future_colour(i)][i] > 0
+
+	def hazard_cells(self):
+		"""Lists every unpainted cell that would cause a conflict if revealed.
+
+		Returns:
+			cells (int[]): Sorted flat indices.
+		"""
+		return sorted(self.hazards)
+
+	def reveal(self, i):
+		"""Reveals and paints a single cell.
+
+		Args:
+			i (int): Flat index of the cell to be revealed.
+
+		Returns:
+			changed (int[]): Indices of the newly painted cells.
+		"""
+		changed = list()
+		if self.flag[i]:
+			return changed
+		if self.bomb[i]:
+			self.paint(i, BOMB_COLOUR)
+			changed.append(i)
+		elif self.covered[i]:
+			self.covered[i] = 0
+			self.paint(i, COLOUR_CLASSES[self.number[i]])
+			self.revealed += 1
+			self.safe_covered -= 1
+			changed.append(i)
+		else:
+			return changed
+		if self.conflicts(i):
+			self.exploded = True
+		return changed
@@ -0,0 +1,189 @@
+"""No-guess board generation.
+
+Candidate boards are drawn with the first click and its neighbours kept
+clear, then played by Solver.solve_game. The first candidate the solver
+finishes without guessing is used. Candidates are tried in batches across a
+process pool, and if none passes before the timeout an ordinary random
+board (still with a safe opening) is returned instead. The search runs on a
+background thread through submit so the Tk thread can keep drawing.
+
+Hardly any normal Super Hard candidate passes, see UNSUPPORTED.
+
+Usage (from this folder):
+	python Generator.py                 report boards per second per core
+	python Generator.py --seconds 5
+"""
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import Engine
+import Solver
+
+BATCH = 8
+TIMEOUT = 3.0
+# Game and level pairs where no-guess boards are not offered. Measured with
+# python Generator.py, normal Super Hard passes 0.0% of candidates, so the
+# search would always time out and fall back to a random board.
+UNSUPPORTED = {("normal", "Super Hard")}
+
+pool = None
+searcher = None
+
+
+def get_pool():
+	"""Process pool shared by every generation request, started on first use."""
+	global pool
+	if pool is None:
+		pool = ProcessPoolExecutor()
+	return pool
+
+
+def supported(game, level):
+	"""Whether no-guess boards are offered for a game type and level."""
+	return (game, level) not in UNSUPPORTED
+
+
+def draw(topology, size_x, size_y, bombs, first, seed):
+	"""Draws a random layout that leaves the first click and its neighbours clear.
+
+	Returns:
+		bombs (int[]): Flat indices of the bombs.
+	"""
+	model = Engine.Model(size_x, size_y, topology)
+	clear = set(model.neighbours(first))
+	clear.add(first)
+	if model.size - len(clear) < bombs:
+		clear = {first}
+	free = [i for i in range(model.size) if i not in clear]
+	return random.Random(seed).sample(free, bombs)
+
+
+def attempt(topology, size_x, size_y, bombs, first, seed):
+	"""Checks one candidate board with the solver.
+
+	Returns:
+		bombs (int[]): The layout if it can be solved without guessing,
+			None otherwise.
+	"""
+	layout = draw(topology, size_x, size_y, bombs, first, seed)
+	model = Engine.Model(size_x, size_y, topology)
+	model.set_bombs(layout)
+	if Solver.solve_game(model, first):
+		return layout
+	return None
+
+
+def attempt_batch(topology, size_x, size_y, bombs, first, seeds):
+	"""Tries candidates in order and stops at the first that passes.
+
+	Returns:
+		result ((int[], int)): Passing layout or None, and candidates tried.
+	"""
+	for tried, seed in enumerate(seeds, 1):
+		layout = attempt(topology, size_x, size_y, bombs, first, seed)
+		if layout is not None:
+			return layout, tried
+	return None, len(seeds)
+
+
+def generate(topology, size_x, size_y, bombs, first, timeout=TIMEOUT, seed=None):
+	"""Generates a board that can be solved without guessing from first.
+
+	Args:
+		topology (str): Either Engine.SQUARE or Engine.HEX.
+		size_x (int): The size of how many cells there should be in a column.
+		size_y (int): The size of how many cells there should be in a row.
+		bombs (int): Amount of bombs to be placed.
+		first (int): Flat index of the first click.
+		timeout (float): Seconds to search before falling back.
+		seed (int): Seed of the first candidate, random when None.
+
+	Returns:
+		result ((int[], bool)): The bomb layout and whether it was verified
+			solvable. Unverified layouts still keep the first click clear.
+	"""
+	if seed is None:
+		seed = random.getrandbits(48)
+	executor = get_pool()
+	workers = os.cpu_count() or 1
+	deadline = time.monotonic() + timeout
+	pending = set()
+	next_seed = seed
+	try:
+		while True:
+			while len(pending) < 2 * workers:
+				seeds = list(range(next_seed, next_seed + BATCH))
+				next_seed += BATCH
+				pending.add(executor.submit(attempt_batch, topology, size_x, size_y, bombs, first, seeds))
+			remaining = deadline - time.monotonic()
+			if remaining <= 0:
+				break
+			done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+			for future in done:
+				layout, _ = future.result()
+				if layout is not None:
+					return layout, True
+	finally:
+		for future in pending:
+			future.cancel()
+	return draw(topology, size_x, size_y, bombs, first, next_seed), False
+
+
+def submit(topology, size_x, size_y, bombs, first, timeout=TIMEOUT, seed=None):
+	"""Starts generate on a background thread and returns straight away.
+
+	Takes the same arguments as generate.
+
+	Returns:
+		future (Future): Resolves to the result of generate.
+	"""
+	global searcher
+	if searcher is None:
+		searcher = ThreadPoolExecutor(max_workers=1)
+	return searcher.submit(generate, topology, size_x, size_y, bombs, first, timeout, seed)
+
+
+def throughput(seconds):
+	"""Reports candidates and solvable boards per second per core for each preset."""
+	cores = os.cpu_count() or 1
+	print("{:8} {:12} {:>12} {:>14} {:>10}".format("mode", "level", "tried/s/core", "solvable/s/core", "pass rate"))
+	for mode, topology in (("normal", Engine.SQUARE), ("hex", Engine.HEX)):
+		for level, (x, y, bombs, _) in Engine.PRESETS[mode].items():
+			first = (y // 2) * x + x // 2
+			executor = get_pool()
+			start = time.perf_counter()
+			futures = list()
+			seed = 0
+			tried = passed = 0
+			while time.perf_counter() - start < seconds:
+				while len(futures) < 2 * cores:
+					futures.append(executor.submit(attempt_batch, topology, x, y, bombs, first, [seed]))
+					seed += 1
+				done, rest = wait(futures, return_when=FIRST_COMPLETED)
+				futures = list(rest)
+				for future in done:
+					layout, count = future.result()
+					tried += count
+					passed += layout is not None
+			wait(futures)
+			for future in futures:
+				layout, count = future.result()
+				tried += count
+				passed += layout is not None
+			elapsed = time.perf_counter() - start
+			print("{:8} {:12} {:>12.1f} {:>14.2f} {:>9.1f}%".format(mode, level, tried / elapsed / cores, passed / elapsed / cores, 100.0 * passed / max(1, tried)))
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="No-guess board generation throughput")
+	parser.add_argument("--seconds", type=float, default=2.0, help="time spent on each preset")
+	args = parser.parse_args(argv)
+	throughput(args.seconds)
+
+
+if __name__ == "__main__":
+	main()
@@ -1,230 +1,101 @@
-import tkinter as tk
-from tkinter import simpledialog
-import time
-import random
 import math
-import sqlite3
-
-class Cell:
-	def __init__(self, canv, x, y):
-		self.bomb = False
-		self.covered = True
-		self.flag = False
-		self.colour = "white"
-		self.number = 0
-		self.x = x
-		self.y = y
-		self.rec = canv.create_polygon(self.getPoints(), outline="#6C7A89", fill="#ABB7B7", tags="rec")
-		if self.x%2 == 0:
-			self.text = canv.create_text(24*self.x + 20, 24*self.y + 17, fill="white",font="Times 15 bold", text="", tags="rec")
-		else:
-			self.text = canv.create_text(24*self.x + 20, 24*self.y + 29, fill="white",font="Times 15 bold", text="", tags="rec")
-
-	def getPoints(self):
-		points = list()
-		for i in range(6):
-			angle_deg = 60 * i
-			angle_rad = math.pi / 180 * angle_deg
-			if self.x%2 == 0:
-				points.append(24*self.x + 12 * math.cos(angle_rad) + 20)
-				points.append(24*self.y + 12 * math.sin(angle_rad) + 17)
-			else:
-				points.append(24*self.x + 12 * math.cos(angle_rad) + 20)
-				points.append(24*self.y + 12 * math.sin(angle_rad) + 29)
-		return points
-
-
-class Board:
-	def __init__(self, root, size_x, size_y, bombs, time, mode, database):
-		self.window = root
-		self.window.configure(background='#BDC3C7')
-		self.canv = tk.Canvas(root, width=25*size_x, height=25*size_y, background='#BDC3C7', highlightbackground="green", highlightcolor="green")
-		self.size_x = size_x
-		self.size_y = size_y
-		self.flag_count = 0
-		self.mode = mode
-
-		self.database = database
-		self.revealed = 0
-		# timer setup
-		self.time = time
-		self.timer = tk.Label(root, text="", background='#BDC3C7')
-		quitButton = tk.Button(root, text="Quit", background='#BDC3C7', command=lambda: self.quit())
-		self.bomb_count = tk.Label(root, text="", background='#BDC3C7')
-		quitButton.grid(row=0, column=1)
-		self.timer.grid(row=0, column=2)
-		self.bomb_count.grid(row=0, column=0)
-
-		self.board = [[Cell(self.canv, x, y) for y in range(size_y)] for x in range(size_x)]
-		self.canv.tag_bind('rec', '<ButtonPress-1>', self.onObjectLeftClick)
-		self.canv.tag_bind('rec', '<ButtonPress-3>', self.onObjectRightClick)
-		self.canv.grid(row=1, columnspan=3)
-		self.bombs = list()
-		self.place_bombs(bombs)
-		self.bomb_count.configure(text="Bombs: " + str(len(self.bombs)))
-		self.update_clock()
-
-	def quit(self):
-		self.window.destroy()
-
-	def update_clock(self):
-		self.timer.configure(text="Score: "+ str(self.time))
-		if self.time > 0:
-			self.time -= 1
-			self.window.after(1000, self.update_clock)
-		else:
-			if not self.check_game():
-				self.game_over("lose")
-
-	def onObjectLeftClick(self, event):
-		print('Got object click', (event.x-4)//24, (event.y-4)//24)
-		item = event.widget.find_closest(event.x, event.y)
-		print(item)
-		x = (item[0]-1)//2//self.size_x
-		y = (item[0]-1)//2%self.size_x
-		print(x, y)
-		self.reveal(x, y)
-		if self.check_game():
-			self.game_over("win")
-
-	def onObjectRightClick(self, event):
-		print('Got object click', (event.x-4)//24, (event.y-4)//24)
-		item = event.widget.find_closest(event.x, event.y)
-		print(item)
-		x = (item[0]-1)//2//self.size_x
-		y = (item[0]-1)//2%self.size_x
-		print(x, y)
-		self.add_flag(x, y)
-		if self.check_game():
-			self.game_over("win")
-
-	def check_game(self):
-		print(self.revealed, (self.size_x*self.size_y)-len(self.bombs))
-		if self.revealed == (self.size_x*self.size_y)-len(self.bombs):
-			return True
-		for x,y in self.bombs:
-			if not self.board[x][y].flag:
-				return False
-		if len(self.bombs) == self.flag_count:
-			return True
-
-	def game_over(self, status):
-		if status == "lose":
-			print("GAMEOVER")
-			self.canv.delete("all")
-			self.canv.create_text(24*self.size_x//2, 24*self.size_y//2, fill="red",font="Times 20 italic bold", text="GAMEOVER")
-			self.time = 0
-		elif status == "win":
-			print("You Win...")
-			self.canv.delete("all")
-			self.canv.create_text(24*self.size_x//2, 24*self.size_y//2, fill="green",font="Times 20 italic bold", text="YOU WIN...")
-			score = self.time
-			self.time = 0
-			name = simpledialog.askstring("Input", "What is your name?", parent=self.window)
-			if name is not None:
-				print("Storing score of: ", score, "By: ", name)
-				c = self.database.cursor()
-				c.execute("INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?, ?)", ("hex", self.mode, name, self.size_x, self.size_y, len(self.bombs), score))
-				self.database.commit()
-
-	def place_bombs(self, bombs):
-		for i in range(bombs):
-			placed = False
-			while (not placed):
-				rand_x = random.randint(0, self.size_x-1)
-				rand_y = random.randint(0, self.size_y-1)
-				if not self.board[rand_x][rand_y].bomb:
-					self.board[rand_x][rand_y].bomb = True
-					self.bombs.append((rand_x, rand_y))
-					if rand_x%2 == 0:
-						for i,j in [(-1, -1), (-1, 0), (0, -1), (0, 1), (1, -1), (1, 0)]:
-							if (0 <= rand_x+i < self.size_x and 0 <= rand_y+j < self.size_y):
-								self.board[rand_x+i][rand_y+j].number += 1
-					else:
-						for i,j in [(-1, 0), (-1, 1), (0, -1), (0, 1), (1, 0), (1, 1)]:
-							if (0 <= rand_x+i < self.size_x and 0 <= rand_y+j < self.size_y):
-								self.board[rand_x+i][rand_y+j].number += 1
-					placed = True
-
-	def add_flag(self, x, y):
-		if not self.board[x][y].covered:
-			return
-		if self.board[x][y].flag:
-			self.board[x][y].flag = False
-			self.flag_count -= 1
-			self.canv.itemconfig(self.board[x][y].rec, fill='#ABB7B7')
-			self.canv.itemconfig(self.board[x][y].text, text='')
-		else:
-			self.board[x][y].flag = True
-			self.flag_count += 1
-			self.canv.itemconfig(self.board[x][y].rec, fill='#26A65B')
-			self.canv.itemconfig(self.board[x][y].text, text='F', fill='#264348')
-
-
-	def reveal(self, x, y):
-		if self.board[x][y].flag:
-			return
-		if self.board[x][y].bomb:
-			self.game_over("lose")
-			return
-		else:
-			if self.board[x][y].covered:
-				self.board[x][y].covered = False
-				self.revealed += 1
-				if self.board[x][y].number == 0:
-					self.canv.itemconfig(self.board[x][y].rec, fill='white')
-					if x%2 == 0:
-						for i,j in [(-1, -1), (-1, 0), (0, -1), (0, 1), (1, -1), (1, 0)]:
-							if (0 <= x+i < self.size_x and 0 <= y+j < self.size_y):
-								if self.board[x+i][y+j].covered:
-									self.reveal(x+i, y+j)
-					else:
-						for i,j in [(-1, 0), (-1, 1), (0, -1), (0, 1), (1, 0), (1, 1)]:
-							if (0 <= x+i < self.size_x and 0 <= y+j < self.size_y):
-								if self.board[x+i][y+j].covered:
-									self.reveal(x+i, y+j)
-				elif self.board[x][y].number == 1:
-					self.canv.itemconfig(self.board[x][y].rec, fill='#89C4F4')
-					self.canv.itemconfig(self.board[x][y].text, text=str(self.board[x][y].number), fill='black')
-				elif self.board[x][y].number == 2:
-					self.canv.itemconfig(self.board[x][y].rec, fill='#F4D03F')
-					self.canv.itemconfig(self.board[x][y].text, text=str(self.board[x][y].number), fill='black')
-				elif self.board[x][y].number == 3:
-					self.canv.itemconfig(self.board[x][y].rec, fill='#CF3A24')
-					self.canv.itemconfig(self.board[x][y].text, text=str(self.board[x][y].number), fill='black')
-				elif self.board[x][y].number > 3:
-					self.canv.itemconfig(self.board[x][y].rec, fill='#8F1D21')
-					self.canv.itemconfig(self.board[x][y].text, text=str(self.board[x][y].number), fill='black')
-			else:
-				return
-
-	def show_board(self):
-		output = ""
-		for y in range(self.size_y):
-			for x in range(self.size_x):
-				if self.board[x][y].bomb:
-					output += "|B|"
-				else:
-					if self.board[x][y].number > 0:
-						output += "|"+ str(self.board[x][y].number) +"|"
-					else:
-						output += "| |"
-			output += "\n"
-		return output
-
-	def __str__(self):
-		output = ""
-		for y in range(self.size_y):
-			for x in range(self.size_x):
-				if not self.board[x][y].covered:
-					if self.board[x][y].bomb:
-						output += "|B|"
-					else:
-						if self.board[x][y].number > 0:
-							output += "|"+ str(self.board[x][y].number) +"|"
-						else:
-							output += "| |"
-				else:
-					output += "|█|"
-			output += "\n"
-		return output
+from functools import lru_cache
+import Engine
+from BoardView import BoardView
+from EndlessView import EndlessView
+
+
+SQRT3 = math.sqrt(3)
+# Half the height of a flat topped hexagon with 12 pixel sides.
+HEX_HALF_HEIGHT = 6 * SQRT3
+
+
+@lru_cache(maxsize=None)
+def hex_template(radius):
+	"""Corner offsets of a flat topped hexagon around its centre.
+
+	Computed once per cell size and translated onto every cell.
+
+	Args:
+		radius (float): Distance from the centre to a corner.
+
+	Returns:
+		template (float[]): Flat list of x, y offsets.
+	"""
+	points = list()
+	for i in range(6):
+		angle_rad = math.pi / 180 * (60 * i)
+		points.append(radius * math.cos(angle_rad))
+		points.append(radius * math.sin(angle_rad))
+	return tuple(points)
+
+
+def hex_points(x, y):
+	"""Corner points of the hexagon drawn for a cell.
+
+	Odd columns are drawn half a cell lower than even columns.
+
+	Args:
+		x (int): x coordinate.
+		y (int): y coordinate.
+
+	Returns:
+		points (float[]): Flat list of x, y pairs.
+	"""
+	cx = 24*x + 20
+	cy = 24*y + 17 + 12*(x%2)
+	template = hex_template(12)
+	return [template[k] + (cy if k & 1 else cx) for k in range(12)]
+
+
+def hex_at(px, py):
+	"""Finds the hexagon drawn under a point.
+
+	Columns are 24 pixels apart and exactly as wide as a hexagon, so the
+	column comes from one division. The row is then rounded to the nearest
+	centre in that column, odd columns being 12 pixels lower, and the point
+	is checked against that hexagon's edges.
+
+	Args:
+		px (float): x canvas coordinate.
+		py (float): y canvas coordinate.
+
+	Returns:
+		cell ((int, int)): x and y coordinate of the cell, None if the point
+			is in a gap between hexagons.
+	"""
+	x = int((px - 8) // 24)
+	top = 17 + 12*(x % 2)
+	y = int((py - top + 12) // 24)
+	dx = abs(px - (24*x + 20))
+	dy = abs(py - (24*y + top))
+	if dy > HEX_HALF_HEIGHT or dx > 12 - dy / SQRT3:
+		return None
+	return x, y
+
+
+class Board(BoardView):
+	"""Board draws an offset column hex Minesweeper grid over an Engine model."""
+	game = "hex"
+	topology = Engine.HEX
+	palette = {1: 'white', 2: '#89C4F4', 3: '#F4D03F', 4: '#CF3A24', 5: '#8F1D21'}
+	pitch = 25
+
+	def shape_coords(self, x, y):
+		return hex_points(x, y)
+
+	def text_position(self, x, y):
+		if x%2 == 0:
+			return 24*x + 20, 24*y + 17
+		return 24*x + 20, 24*y + 29
+
+	def create_shape(self, coords):
+		return self.canv.create_polygon(coords, outline="#6C7A89", fill="#ABB7B7", tags="rec")
+
+	def cell_at(self, px, py):
+		return hex_at(px, py)
+
+
+class EndlessBoard(EndlessView, Board):
+	"""EndlessBoard draws an endless hex board with the Board geometry."""
+	game = "endless hex"
@@ -1,47 +1,94 @@
+import sys
+import time
+STARTED = time.perf_counter()
 import tkinter as tk
 from tkinter import font as tkfont
-import random
-import sys
-import NormalGrid as normal
-import HexGrid as hex
-import ColourGrid as colour
-import sqlite3
-sys.setrecursionlimit(15000)
+IMPORTED = time.perf_counter()
+# The game modules and sqlite3 are imported the first time they are needed so
+# the menu shows as soon as Tk is up.
 
 class App(tk.Tk):
 	def __init__(self, *args, **kwargs):
 		tk.Tk.__init__(self, *args, **kwargs)
+		self.title("Minesweeper")
 		self.title_font = tkfont.Font(family='Helvetica', size=18, weight="bold", slant="italic")
-		self.database = sqlite3.connect('highscores.db')
+		self._database = None
+		self._scores = None
+		self._leaderboard = None
+		self._clock = None
 
-		container = tk.Frame(self)
-		container.pack(side="top", fill="both", expand=True)
-		container.grid_rowconfigure(0, weight=1)
-		container.grid_columnconfigure(0, weight=1)
-		# Setup the pages to switch between
+		self.container = tk.Frame(self)
+		self.container.pack(side="top", fill="both", expand=True)
+		self.container.grid_rowconfigure(0, weight=1)
+		self.container.grid_columnconfigure(0, weight=1)
+		# Setup the pages to switch between, each is built on first show
+		self.pages = {F.__name__: F for F in (MenuScreen, Game, Highscores)}
 		self.frames = {}
-		for F in (MenuScreen, Game, Highscores):
-			page_name = F.__name__
-			frame = F(parent=container, controller=self, database=self.database)
-			self.frames[page_name] = frame
-			frame.grid(row=0, column=0, sticky="nsew")
 
 		self.show_frame("MenuScreen")
+		# Closing the window goes through quit so queued scores are written.
+		self.protocol("WM_DELETE_WINDOW", self.quit)
+
+	@property
+	def database(self):
+		"""Connection the high score page reads through, opened on first use."""
+		if self._database is None:
+			import sqlite3
+			import Scores
+			self._database = sqlite3.connect('highscores.db')
+			Scores.prepare(self._database)
+		return self._database
+
+	@property
+	def scores(self):
+		"""Background writer the boards save scores through, started on first use."""
+		if self._scores is None:
+			import Scores
+			self.database
+			self._scores = Scores.ScoreWriter('highscores.db')
+		return self._scores
+
+	@property
+	def clock(self):
+		"""Clock that times every open board, made on first use."""
+		if self._clock is None:
+			import Clock
+			self._clock = Clock.Clock(self)
+		return self._clock
+
+	@property
+	def leaderboard(self):
+		"""In memory top scores the high score page opens with, built on first use."""
+		if self._leaderboard is None:
+			import Scores
+			self._leaderboard = Scores.Leaderboard(self.database, self.scores)
+		return self._leaderboard
+
+	def get_frame(self, page_name):
+		frame = self.frames.get(page_name)
+		if frame is None:
+			frame = self.pages[page_name](parent=self.container, controller=self)
+			self.frames[page_name] = frame
+			frame.grid(row=0, column=0, sticky="nsew")
+		return frame
 
 	def show_frame(self, page_name):
+		frame = self.get_frame(page_name)
 		if page_name == "Highscores":
-			self.frames[page_name].load_highscores()
-		frame = self.frames[page_name]
+			frame.load_highscores()
 		frame.tkraise()
 
 	def quit(self):
+		if self._scores is not None:
+			self._scores.close()
+		if self._database is not None:
+			self._database.close()
 		exit()
 
 class MenuScreen(tk.Frame):
-	def __init__(self, parent, controller, database):
+	def __init__(self, parent, controller):
 		tk.Frame.__init__(self, parent, background='#BDC3C7')
 		self.controller = controller
-		self.database = database
 		label = tk.Label(self, text="Menu", font=controller.title_font, background='#BDC3C7')
 		highscores_button = tk.Button(self, text="High Scores", command=lambda: controller.show_frame("Highscores"), height=2, width=40, background="#6C7A89")
 		quit_button = tk.Button(self, text="Quit", command=lambda: controller.quit(), height=2, width=40, background="#6C7A89")
@@ -53,41 +100,82 @@ class MenuScreen(tk.Frame):
 		quit_button.pack()
 
 class Highscores(tk.Frame):
-	def __init__(self, parent, controller, database):
+	"""High scores of one game type and level, best first.
+
+	Scores are fetched a page at a time, the next page is read when the list
+	is scrolled to its end.
+	"""
+	def __init__(self, parent, controller):
 		tk.Frame.__init__(self, parent, background='#BDC3C7')
 		self.controller = controller
-		self.database = database
+		# Score and rowid of the last entry shown, None once every entry is.
+		self.last = None
 		label = tk.Label(self, text="High Scores", font=controller.title_font, background='#BDC3C7')
 		home_button = tk.Button(self, text="Go Home", command=lambda: controller.show_frame("MenuScreen"), height=2, width=40, background="#6C7A89")
+		filters = tk.Frame(self, background='#BDC3C7')
+		self.game_choice = tk.StringVar(self, value='normal')
+		self.level_choice = tk.StringVar(self, value='Easy')
+		game_selector = tk.OptionMenu(filters, self.game_choice, 'normal', 'hex', 'colour', 'endless', 'endless hex', command=lambda _: self.load_highscores())
+		level_selector = tk.OptionMenu(filters, self.level_choice, 'Easy', 'Medium', 'Hard', 'Super Hard', command=lambda _: self.load_highscores())
+		for selector in (game_selector, level_selector):
+			selector.configure(width=17, background="#6C7A89", highlightbackground="green", highlightcolor="green")
 		highscorefont = tkfont.Font(family='Consolas', size=10, weight="bold")
-		self.listbox = tk.Listbox(self, width=100, font=highscorefont, background="#6C7A89")
+		scores = tk.Frame(self)
+		self.scrollbar = tk.Scrollbar(scores)
+		self.listbox = tk.Listbox(scores, width=100, height=20, font=highscorefont, background="#6C7A89", yscrollcommand=self.on_scroll)
+		self.scrollbar.configure(command=self.listbox.yview)
 		label.pack(side="top", fill="x", pady=10)
 		home_button.pack()
+		game_selector.pack(side="left")
+		level_selector.pack(side="left")
+		filters.pack()
 
-		self.listbox.pack()
+		self.scrollbar.pack(side="right", fill="y")
+		self.listbox.pack(side="left")
+		scores.pack()
 
 	def load_highscores(self):
 		self.listbox.delete(0, tk.END)
-		c = self.database.cursor()
-		entry = "|{:10}|{:10}|{:10}|{:10}|".format('Game Type', 'Level', 'Name', 'Score')
+		entry = "|{:12}|{:10}|{:10}|{:10}|".format('Game Type', 'Level', 'Name', 'Score')
 		self.listbox.insert(tk.END, entry)
-		for b in c.execute('SELECT * FROM scores'):
-			entry = "|{:<10}|{:<10}|{:<10}|{:<10}|".format(b[0], b[1], b[2], b[6])
+		self.last = None
+		self.load_page(first=True)
+
+	def load_page(self, first=False):
+		"""Appends the next page of scores to the list."""
+		import Scores
+		if self.last is None and not first:
+			return
+		game = self.game_choice.get()
+		level = self.level_choice.get()
+		if first:
+			rows = self.controller.leaderboard.top(game, level)
+		else:
+			rows = Scores.top_scores(self.controller.database, game, level, self.last)
+		for rowid, player, score in rows:
+			entry = "|{:<12}|{:<10}|{:<10}|{:<10}|".format(game, level, player, score)
 			self.listbox.insert(tk.END, entry)
+		self.last = None
+		if len(rows) == Scores.PAGE:
+			self.last = (rows[-1][2], rows[-1][0])
+
+	def on_scroll(self, first, last):
+		self.scrollbar.set(first, last)
+		if float(last) >= 1.0:
+			self.load_page()
 
 
 class Game(tk.Frame):
-	def __init__(self, parent, controller, database):
+	def __init__(self, parent, controller):
 		tk.Frame.__init__(self, parent, background='#BDC3C7')
-		self.winfo_toplevel().title("Minesweeper")
 		self.controller = controller
-		self.database = database
 
 		label = tk.Label(self, text="Game", font=controller.title_font, background='#BDC3C7')
 		home_button = tk.Button(self, text="Go Home", command=lambda: controller.show_frame("MenuScreen"), height=2, width=40, background="#6C7A89")
 		normal_button = tk.Button(self, text="Start Normal", command=lambda: self.run_normal(), height=2, width=40, background="#6C7A89")
 		hex_button = tk.Button(self, text="Start Hex", command=lambda: self.run_hex(), height=2, width=40, background="#6C7A89")
 		colour_button = tk.Button(self, text="Start Colour", command=lambda: self.run_colour(), height=2, width=40, background="#6C7A89")
+		resume_button = tk.Button(self, text="Resume Saved Game", command=lambda: self.resume_game(), height=2, width=40, background="#6C7A89")
 
 		self.level_choice = tk.StringVar(self)
 		self.levels = ['Easy', 'Medium', 'Hard', 'Super Hard']
@@ -95,96 +183,138 @@ class Game(tk.Frame):
 		self.level_selector = tk.OptionMenu(self, self.level_choice, *self.levels)
 		self.level_selector.configure(width=40, background="#6C7A89", highlightbackground="green", highlightcolor="green")
 		level_label = tk.Label(self, text="Select Level", background='#BDC3C7')
+		self.no_guess = tk.BooleanVar(self, value=False)
+		no_guess_check = tk.Checkbutton(self, text="No guessing (Normal and Hex, not Normal Super Hard)", variable=self.no_guess, background='#BDC3C7')
+		self.endless = tk.BooleanVar(self, value=False)
+		endless_check = tk.Checkbutton(self, text="Endless board (Normal and Hex)", variable=self.endless, background='#BDC3C7')
+		seed_label = tk.Label(self, text="Seed (blank for random)", background='#BDC3C7')
+		self.seed_choice = tk.StringVar(self, value='')
+		seed_entry = tk.Entry(self, textvariable=self.seed_choice, width=40)
 
 
 		label.pack(side="top", fill="x", pady=10)
 		home_button.pack()
 		level_label.pack()
 		self.level_selector.pack()
+		no_guess_check.pack()
+		endless_check.pack()
+		seed_label.pack()
+		seed_entry.pack()
 		normal_button.pack()
 		hex_button.pack()
 		colour_button.pack()
+		resume_button.pack()
+
+	def chosen_seed(self):
+		"""Seed typed in by the player, None for a random board."""
+		text = self.seed_choice.get().strip()
+		if text.isdigit():
+			return int(text) % 2**64
+		return None
+
+	def show_title(self, window, name, board):
+		"""Titles a game window, with the seed only when it reproduces the board.
+
+		Args:
+			window (Toplevel): Window the board is in.
+			name (str): Game name shown before "Minesweeper".
+			board (BoardView): The board in the window.
+		"""
+		title = name + " Minesweeper"
+		if board.model.from_seed():
+			title += " - seed " + str(board.model.seed)
+		window.winfo_toplevel().title(title)
+
+	def run_endless(self, grid, game):
+		"""Opens an endless board as dense as the chosen level of a game.
+
+		Args:
+			grid (module): NormalGrid or HexGrid.
+			game (str): Key of Engine.PRESETS the density is taken from.
+		"""
+		import Engine
+		import Endless
+		window = tk.Toplevel(self)
+		option = self.level_choice.get()
+		x, y, bombs, _ = Engine.PRESETS[game][option]
+		per_chunk = round(bombs * Endless.CHUNK * Endless.CHUNK / (x * y))
+		self.endless_board = grid.EndlessBoard(window, per_chunk, option, self.controller.scores, seed=self.chosen_seed())
+		window.winfo_toplevel().title("Endless " + game.capitalize() + " Minesweeper - seed " + str(self.endless_board.model.seed))
 
 	def run_normal(self):
+		import Engine
+		import NormalGrid as normal
+		if self.endless.get():
+			self.run_endless(normal, "normal")
+			return
 		window = tk.Toplevel(self)
-		window.winfo_toplevel().title("Normal Minesweeper")
 		option = self.level_choice.get()
-		if (option == 'Easy'):
-			x = 10
-			y = 10
-			bombs = 8
-			time = 120
-		elif (option == 'Medium'):
-			x = 20
-			y = 20
-			bombs = 30
-			time = 300
-		elif (option == 'Hard'):
-			x = 30
-			y = 30
-			bombs = 100
-			time = 600
-		elif (option == 'Super Hard'):
-			x = 30
-			y = 30
-			bombs = 200
-			time = 600
-		self.normal_board = normal.Board(window, x, y, bombs, time, option, self.database)
+		x, y, bombs, time = Engine.PRESETS["normal"][option]
+		self.normal_board = normal.Board(window, x, y, bombs, time, option, self.controller.scores, no_guess=self.no_guess.get(), seed=self.chosen_seed(), clock=self.controller.clock)
+		self.show_title(window, "Normal", self.normal_board)
 
 	def run_hex(self):
+		import Engine
+		import HexGrid as hex
+		if self.endless.get():
+			self.run_endless(hex, "hex")
+			return
 		window = tk.Toplevel(self)
-		window.winfo_toplevel().title("Normal Minesweeper")
 		option = self.level_choice.get()
-		if (option == 'Easy'):
-			x = 15
-			y = 15
-			bombs = 10
-			time = 120
-		elif (option == 'Medium'):
-			x = 20
-			y = 20
-			bombs = 30
-			time = 300
-		elif (option == 'Hard'):
-			x = 30
-			y = 30
-			bombs = 100
-			time = 600
-		elif (option == 'Super Hard'):
-			x = 30
-			y = 30
-			bombs = 200
-			time = 600
-		self.hex_board = hex.Board(window, x, y, bombs, time, option, self.database)
+		x, y, bombs, time = Engine.PRESETS["hex"][option]
+		self.hex_board = hex.Board(window, x, y, bombs, time, option, self.controller.scores, no_guess=self.no_guess.get(), seed=self.chosen_seed(), clock=self.controller.clock)
+		self.show_title(window, "Hex", self.hex_board)
 
 	def run_colour(self):
+		import Engine
+		import ColourGrid as colour
 		window = tk.Toplevel(self)
-		window.winfo_toplevel().title("Normal Minesweeper")
 		option = self.level_choice.get()
-		if (option == 'Easy'):
-			x = 10
-			y = 10
-			bombs = 15
-			time = 120
-		elif (option == 'Medium'):
-			x = 20
-			y = 20
-			bombs = 30
-			time = 300
-		elif (option == 'Hard'):
-			x = 30
-			y = 30
-			bombs = 100
-			time = 600
-		elif (option == 'Super Hard'):
-			x = 30
-			y = 30
-			bombs = 200
-			time = 600
-		self.colour_board = colour.Board(window, x, y, bombs, time, option, self.database)
+		x, y, bombs, time = Engine.PRESETS["colour"][option]
+		self.colour_board = colour.Board(window, x, y, bombs, time, option, self.controller.scores, seed=self.chosen_seed(), clock=self.controller.clock)
+		self.show_title(window, "Colour", self.colour_board)
+
+	def resume_game(self, path=None):
+		"""Opens a saved game in a new window, asking for the file when no path is given."""
+		from tkinter import filedialog
+		import Snapshot
+		if path is None:
+			path = filedialog.askopenfilename(parent=self, filetypes=[("Minesweeper save", "*.snap")])
+			if not path:
+				return
+		saved = Snapshot.resume(path)
+		if saved["game"] == "normal":
+			import NormalGrid as grid
+		elif saved["game"] == "hex":
+			import HexGrid as grid
+		else:
+			import ColourGrid as grid
+		model = saved["model"]
+		window = tk.Toplevel(self)
+		self.resumed_board = grid.Board(window, model.size_x, model.size_y, len(model.bombs), saved["time_left"], saved["level"], self.controller.scores, saved=saved, clock=self.controller.clock)
+		self.show_title(window, saved["game"].capitalize(), self.resumed_board)
+
+
+def startup_profile(app):
+	"""Prints how long each stage took to get the menu onto the screen.
+
+	Args:
+		app (App): The application, just built.
+	"""
+	built = time.perf_counter()
+	app.update()
+	painted = time.perf_counter()
+	print("imports     {:8.1f}ms".format((IMPORTED - STARTED) * 1000))
+	print("app build   {:8.1f}ms".format((built - IMPORTED) * 1000))
+	print("first paint {:8.1f}ms".format((painted - built) * 1000))
+	print("total       {:8.1f}ms".format((painted - STARTED) * 1000))
+	loaded = ", ".join(sorted(name for name in ("Engine", "NormalGrid", "HexGrid", "ColourGrid", "sqlite3") if name in sys.modules))
+	print("modules loaded:", loaded or "none")
 
 
 if __name__ == "__main__":
 	app = App()
 	app.geometry("500x500")
+	if "--startup-profile" in sys.argv:
+		startup_profile(app)
 	app.mainloop()
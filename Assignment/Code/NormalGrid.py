@@ -1,301 +1,33 @@
-import tkinter as tk
-from tkinter import simpledialog
-import time
-import random
-import sqlite3
+import Engine
+from BoardView import BoardView
+from EndlessView import EndlessView
 
-class Cell:
-	"""Cell stores the relevant information about each cell tile.
 
-   Attributes:
-	   bomb (bool): Stores if the cell contains a bomb.
-	   covered (bool): Stores if the cell if revealed or covered from user.
-	   flag (bool): Stores if the cell if marked with a flag.
-	   colour (str): The colour of the tile.
-	   number (int): The number of neighbouring bombs.
-	   x (int): x coordinate ID used for drawing reletive.
-	   y (int): y coordinate ID used for drawing reletive.
-	   rec (Rectangle): Canvas Rectangle used in drawing.
-	   text (Text): Canvas Text used in drawing number of neighbouring bombs.
+class Board(BoardView):
+	"""Board draws a square Minesweeper grid over an Engine model.
 
-   """
-	def __init__(self, canv, x, y):
-		"""Cell Setup call.
+	Each cell is a rectangle with a text item on top for the number of
+	neighbouring bombs or the flag marker.
 
-        The default setup is that there is no bomb, the cell is covered and there
-		is no flag. Also the colour is default white and x, y coordinates are set.
-		The drawing objects are also created at this point.
+	"""
+	game = "normal"
+	topology = Engine.SQUARE
+	palette = {1: 'white', 2: '#89C4F4', 3: '#F4D03F', 4: '#CF3A24', 5: '#8F1D21'}
 
-        Args:
-            canv (Canvas): The canvas the cell should be drawn on.
-            x (int): x coordinate.
-            y (int): y coordinate.
+	def shape_coords(self, x, y):
+		return [24*x + 4, 24*y + 4, 24*x + 22, 24*y + 22]
 
-        """
-		self.bomb = False
-		self.covered = True
-		self.flag = False
-		self.colour = "white"
-		self.number = 0
-		self.x = x
-		self.y = y
-		self.rec = canv.create_rectangle(24*x + 4, 24*y + 4, 24*x + 22, 24*y + 22, outline="#6C7A89", fill="#ABB7B7", tags="rec")
-		self.text = canv.create_text(24*x + 13, 24*y + 13, fill="white", font="Times 15 bold", text="", tags="rec")
+	def text_position(self, x, y):
+		return 24*x + 13, 24*y + 13
 
+	def create_shape(self, coords):
+		return self.canv.create_rectangle(*coords, outline="#6C7A89", fill="#ABB7B7", tags="rec")
 
-class Board:
-	"""Board stores references to all the Cells and has functions to play the game.
+	def cell_at(self, px, py):
+		"""Square cells sit on a 24 pixel grid offset by 4 pixels."""
+		return int((px-4)//24), int((py-4)//24)
 
-   Attributes:
-	   canv (Canvas): The canvas the board should be drawn onto.
-	   size_x (int): The size of how many cells there should be in a column.
-	   size_y (int): The size of how many cells there should be in a row.
-	   flag_count (int): How many flags are on the board.
-	   board (Cell[][]): The 2D array to store the cells.
-	   bombs ((int, int)[]): x and y coordinates of the bombs locations.
 
-   """
-	def __init__(self, root, size_x, size_y, bombs, time, mode, database):
-		"""Board setup.
-
-        This setup just creates the board then sets random cells to contain bombs.
-
-        Args:
-            root (Panel): Where the Canvas should be created.
-            size_x (int): The size of how many cells there should be in a column.
-			size_y (int): The size of how many cells there should be in a row.
-            bombs (int): Amount of bombs to be placed.
-
-        """
-		self.window = root
-		self.window.configure(background='#BDC3C7')
-		self.canv = tk.Canvas(root, width=24*size_x, height=24*size_y, background='#BDC3C7', highlightbackground="green", highlightcolor="green")
-		self.size_x = size_x
-		self.size_y = size_y
-		self.flag_count = 0
-		self.mode = mode
-
-		self.database = database
-		self.revealed = 0
-		# timer setup
-		self.time = time
-		self.timer = tk.Label(root, text="", background='#BDC3C7')
-		quitButton = tk.Button(root, text="Quit", background='#BDC3C7', command=lambda: self.quit())
-		self.bomb_count = tk.Label(root, text="", background='#BDC3C7')
-		quitButton.grid(row=0, column=1)
-		self.timer.grid(row=0, column=2)
-		self.bomb_count.grid(row=0, column=0)
-
-		self.board = [[Cell(self.canv, x, y) for y in range(size_y)] for x in range(size_x)]
-		self.canv.tag_bind('rec', '<ButtonPress-1>', self.onObjectLeftClick)
-		self.canv.tag_bind('rec', '<ButtonPress-3>', self.onObjectRightClick)
-		self.canv.grid(row=1, columnspan=3)
-		self.bombs = list()
-		self.place_bombs(bombs)
-		self.bomb_count.configure(text="Bombs: " + str(len(self.bombs)))
-		self.update_clock()
-
-	def quit(self):
-		self.window.destroy()
-
-	def update_clock(self):
-		self.timer.configure(text="Score: "+ str(self.time))
-		if self.time > 0:
-			self.time -= 1
-			self.window.after(1000, self.update_clock)
-		else:
-			if not self.check_game():
-				self.game_over("lose")
-
-	def onObjectLeftClick(self, event):
-		"""Left click event onto a cell.
-
-		Handles the event of clicking onto a cell.
-
-        Args:
-            event (Event): Details of the event that triggered.
-        """
-		print('Got object click', (event.x-4)//24, (event.y-4)//24)
-		self.reveal((event.x-4)//24, (event.y-4)//24)
-		print(event.widget.find_closest(event.x, event.y))
-		if self.check_game():
-			self.game_over("win")
-
-	def onObjectRightClick(self, event):
-		"""Right click event onto a cell.
-
-		Handles the event of right clicking onto a cell.
-
-        Args:
-            event (Event): Details of the event that triggered.
-        """
-		print('Got object click', (event.x-4)//24, (event.y-4)//24)
-		self.addFlag((event.x-4)//24, (event.y-4)//24)
-		print(event.widget.find_closest(event.x, event.y))
-		if self.check_game():
-			self.game_over("win")
-
-	def check_game(self):
-		"""Checks if game state is complete.
-
-		Checks list of bombs to see if they have been flagged, and also checks
-		there isnt any extra flags.
-
-        Returns:
-            True if complete, False otherwise.
-        """
-		if self.revealed == (self.size_x*self.size_y)-len(self.bombs):
-			return True
-		for x,y in self.bombs:
-			if not self.board[x][y].flag:
-				return False
-		if len(self.bombs) == self.flag_count:
-			return True
-
-	def game_over(self, status):
-		if status == "lose":
-			print("GAMEOVER")
-			self.canv.delete("all")
-			self.canv.create_text(24*self.size_x//2, 24*self.size_y//2, fill="red",font="Times 20 italic bold", text="GAMEOVER")
-			self.time = 0
-		elif status == "win":
-			print("You Win...")
-			self.canv.delete("all")
-			self.canv.create_text(24*self.size_x//2, 24*self.size_y//2, fill="green",font="Times 20 italic bold", text="YOU WIN...")
-			score = self.time
-			self.time = 0
-			name = simpledialog.askstring("Input", "What is your name?", parent=self.window)
-			if name is not None:
-				print("Storing score of: ", score, "By: ", name)
-				c = self.database.cursor()
-				c.execute("INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?, ?)", ("normal", self.mode, name, self.size_x, self.size_y, len(self.bombs), score))
-				self.database.commit()
-
-
-	def place_bombs(self, bombs):
-		"""Places bombs on random cells.
-
-        Randomly picks new spots to place bombs.
-
-        Args:
-            bombs (int): amount of bombs to place
-        """
-		for i in range(bombs):
-			placed = False
-			while (not placed):
-				rand_x = random.randint(0, self.size_x-1)
-				rand_y = random.randint(0, self.size_y-1)
-				if not self.board[rand_x][rand_y].bomb:
-					self.board[rand_x][rand_y].bomb = True
-					self.bombs.append((rand_x, rand_y))
-					for i in range(-1, 2):
-						for j in range(-1, 2):
-							if (i == 0 and j == 0):
-								continue
-							if (0 <= rand_x+i < self.size_x and 0 <= rand_y+j < self.size_y):
-								self.board[rand_x+i][rand_y+j].number += 1
-					placed = True
-
-	def addFlag(self, x, y):
-		"""Adds a flag to the relevant Cell.
-
-		Adds a flag to the cell then updates the drawing, after then checks
-		gamestate to see if the user won.
-
-        Args:
-            x (int): x coordinate of Cell targeted.
-			y (int): y coordinate of Cell targeted.
-        """
-		if not self.board[x][y].covered:
-			return
-		if self.board[x][y].flag:
-			self.board[x][y].flag = False
-			self.flag_count -= 1
-			self.canv.itemconfig(self.board[x][y].rec, fill='#ABB7B7')
-			self.canv.itemconfig(self.board[x][y].text, text='')
-		else:
-			self.board[x][y].flag = True
-			self.flag_count += 1
-			self.canv.itemconfig(self.board[x][y].rec, fill='#26A65B')
-			self.canv.itemconfig(self.board[x][y].text, text='F', fill='#264348')
-
-
-	def reveal(self, x, y):
-		"""Recursive method to reveal Cells.
-
-        Recursively reaveals a cell then if that cell has 0 neighbouring bombs
-		it calls the Recursive method on each neighbour that isnt revealed.
-
-        Args:
-            x (int): x coordinate of Cell to be revealed.
-			y (int): y coordinate of Cell to be revealed.
-
-        """
-		if self.board[x][y].flag:
-			return
-		if self.board[x][y].bomb:
-			self.game_over("lose")
-			return
-		else:
-			if self.board[x][y].covered:
-				self.board[x][y].covered = False
-				self.revealed += 1
-				if self.board[x][y].number == 0:
-					self.canv.itemconfig(self.board[x][y].rec, fill='white')
-					for i in range(-1, 2):
-						for j in range(-1, 2):
-							if (i == 0 and j == 0):
-								continue
-							if (0 <= x+i < self.size_x and 0 <= y+j < self.size_y):
-								if self.board[x+i][y+j].covered:
-									self.reveal(x+i, y+j)
-				elif self.board[x][y].number == 1:
-					self.canv.itemconfig(self.board[x][y].rec, fill='#89C4F4')
-					self.canv.itemconfig(self.board[x][y].text, text=str(self.board[x][y].number), fill='black')
-				elif self.board[x][y].number == 2:
-					self.canv.itemconfig(self.board[x][y].rec, fill='#F4D03F')
-					self.canv.itemconfig(self.board[x][y].text, text=str(self.board[x][y].number), fill='black')
-				elif self.board[x][y].number == 3:
-					self.canv.itemconfig(self.board[x][y].rec, fill='#CF3A24')
-					self.canv.itemconfig(self.board[x][y].text, text=str(self.board[x][y].number), fill='black')
-				elif self.board[x][y].number > 3:
-					self.canv.itemconfig(self.board[x][y].rec, fill='#8F1D21')
-					self.canv.itemconfig(self.board[x][y].text, text=str(self.board[x][y].number), fill='black')
-			else:
-				return
-
-	def show_board(self):
-		"""Shows board state for debugging.
-
-		Returns:
-			output (str): Board view.
-        """
-		output = ""
-		for y in range(self.size_y):
-			for x in range(self.size_x):
-				if self.board[x][y].bomb:
-					output += "|B|"
-				else:
-					if self.board[x][y].number > 0:
-						output += "|"+ str(self.board[x][y].number) +"|"
-					else:
-						output += "| |"
-			output += "\n"
-		return output
-
-	def __str__(self):
-		output = ""
-		for y in range(self.size_y):
-			for x in range(self.size_x):
-				if not self.board[x][y].covered:
-					if self.board[x][y].bomb:
-						output += "|B|"
-					else:
-						if self.board[x][y].number > 0:
-							output += "|"+ str(self.board[x][y].number) +"|"
-						else:
-							output += "| |"
-				else:
-					output += "|█|"
-			output += "\n"
-		return output
+class EndlessBoard(EndlessView, Board):
+	"""EndlessBoard draws an endless square board with the Board geometry."""
+	game = "endless"
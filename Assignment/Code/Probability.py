@@ -0,0 +1,509 @@
+"""Exact mine probabilities for the covered cells of a board.
+
+Covered cells next to a revealed number form the frontier. Cells a single
+number forces (one with all its mines accounted for, or with exactly as many
+covered cells as mines left) are fixed first, which splits the frontier
+further. The rest is split into independent components (cells linked
+through shared numbers).
+
+Each component is counted without backtracking. Its cells are put in a band
+order (Cuthill-McKee) so every number's cells sit close together, then walked
+once while keeping, for every distinct way of filling the cells so far, the
+mines still needed by the numbers that are only partly filled. Fillings that
+agree on those needs share one entry, so the work follows the width of the
+component rather than growing exponentially with its length. Counts grouped
+by mine count are polynomials packed into one integer, so they are added and
+multiplied in C, and a pass back over the same states gives every cell's
+counts. The components are then combined with the cells off the frontier
+using the global remaining mine count and binomial weights, in floating
+point with every term tilted by the board's mine odds so the terms that
+matter stay within the range of a float.
+
+A component that would take more than BUDGET steps is estimated instead, see
+estimate, so a call always returns promptly.
+
+Component results are memoised on the component's cells and numbers, so
+after a move only the components it changed are counted again.
+"""
+
+from math import exp, lgamma, log
+from operator import mul
+
+# Most states, weighted by the cells counted so far, held for one component
+# before it is estimated instead.
+BUDGET = 400000
+# Weights of an estimated component below this share of the largest are
+# dropped, see estimate.
+ESTIMATE_CUTOFF = 1e-12
+# Most sweeps of iterative scaling an estimate makes, and the change in any
+# chance below which it stops early.
+ESTIMATE_ROUNDS = 50
+ESTIMATE_TOLERANCE = 1e-4
+
+
+class Component:
+	"""Solution counts of one independent part of the frontier.
+
+	Attributes:
+		cells (int[]): Frontier cells in the component.
+		totals (int[]): Solutions using k mines, indexed by k. Relative
+			float weights when estimated.
+		cell_totals (dict): For every cell, solutions using k mines in which
+			that cell is a mine, indexed by k.
+		exact (bool): False when the counts are an estimate.
+		low (int): Fewest mines of any solution.
+		weights (float[]): totals from low on, divided by the largest.
+		cell_weights (dict): cell_totals from low on, divided by the same.
+
+	"""
+	__slots__ = ("cells", "totals", "cell_totals", "exact", "low", "weights", "cell_weights")
+
+	def __init__(self, cells, totals, cell_totals, exact=True):
+		self.cells = cells
+		self.totals = totals
+		self.cell_totals = cell_totals
+		self.exact = exact
+		used = [k for k, count in enumerate(totals) if count]
+		self.low = used[0] if used else 0
+		high = used[-1] + 1 if used else 0
+		top = max(totals)
+		self.weights = [count / top for count in totals[self.low:high]]
+		self.cell_weights = {c: [count / top for count in counts[self.low:high]] for c, counts in cell_totals.items()}
+
+
+def band_order(cells, members):
+	"""Orders a component's cells so cells sharing a number sit close together.
+
+	A breadth first sweep from the cell at the far end of another sweep,
+	visiting the least linked cells first, keeps few numbers partly filled at
+	any point of the walk.
+
+	Args:
+		cells (int[]): Frontier cells in the component.
+		members (int[][]): Positions in cells of every number's cells.
+
+	Returns:
+		order (int[]): Positions in cells, in walking order.
+	"""
+	links = [set() for _ in cells]
+	for group in members:
+		for p in group:
+			links[p].update(group)
+	for p, linked in enumerate(links):
+		linked.discard(p)
+
+	def sweep(root):
+		order = [root]
+		seen = {root}
+		for p in order:
+			for n in sorted(links[p] - seen, key=lambda n: len(links[n])):
+				seen.add(n)
+				order.append(n)
+		return order
+
+	return sweep(sweep(min(range(len(cells)), key=lambda p: len(links[p])))[-1])
+
+
+def unpack(value, start, stop, width):
+	"""Reads coefficients start to stop of a packed polynomial.
+
+	Args:
+		value (int): Coefficient k in bytes k*width to (k+1)*width.
+		start (int): First coefficient wanted.
+		stop (int): One past the last coefficient wanted.
+		width (int): Bytes per coefficient.
+
+	Returns:
+		coefficients (int[]): The coefficients, lowest first.
+	"""
+	data = (value >> (8 * width * start)).to_bytes((stop - start) * width, 'little')
+	return [int.from_bytes(data[k*width:(k+1)*width], 'little') for k in range(stop - start)]
+
+
+def count_solutions(cells, members, needs, budget=BUDGET):
+	"""Counts the mine layouts of a component, grouped by mine count.
+
+	The cells are walked in the order given. Before each cell, a state holds
+	the mines still needed by every number with some but not all of its cells
+	walked, and maps to the packed counts of the fillings reaching it. Numbers
+	are checked as their cells are filled and dropped once complete.
+
+	Args:
+		cells (int[]): Frontier cells in walking order.
+		members (int[][]): Positions in cells of every number's cells.
+		needs (int[]): Mines each number still needs among its cells.
+		budget (int): Most states, weighted by cells walked, to hold.
+
+	Returns:
+		component (Component): Counts grouped by number of mines, None if
+			the budget ran out.
+	"""
+	size = len(cells)
+	# Bytes per packed coefficient, no count can exceed 2**size.
+	width = size // 8 + 1
+	shift = 8 * width
+	first = [min(group) for group in members]
+	last = [max(group) for group in members]
+	touching = [list() for _ in cells]
+	for k, group in enumerate(members):
+		for j, p in enumerate(sorted(group)):
+			# Cells of the number still to be filled after this one.
+			touching[p].append((k, len(group) - j - 1))
+
+	layers = list()
+	current = {(): 1}
+	active = list()
+	held = 0
+	for t in range(size):
+		slot = {k: j for j, k in enumerate(active)}
+		after = [k for k in active if last[k] != t]
+		after += [k for k, _ in touching[t] if first[k] == t and last[k] != t]
+		left = dict(touching[t])
+		# Per number open after this cell: where its need comes from (a slot
+		# of the state, or its starting need) and the cells it has left when
+		# this cell belongs to it.
+		carry = [(slot.get(k, -1), needs[k], left.get(k, -1)) for k in after]
+		closing = [(slot.get(k, -1), needs[k]) for k, rest in touching[t] if rest == 0]
+
+		def step(state, mine):
+			for j, need in closing:
+				if (state[j] if j >= 0 else need) != mine:
+					return None
+			result = list()
+			for j, need, rest in carry:
+				value = state[j] if j >= 0 else need
+				if rest >= 0:
+					value -= mine
+					if value < 0 or value > rest:
+						return None
+				result.append(value)
+			return tuple(result)
+
+		following = dict()
+		moves = list()
+		for state, count in current.items():
+			safe = step(state, 0)
+			mine = step(state, 1)
+			if safe is not None:
+				following[safe] = following.get(safe, 0) + count
+			if mine is not None:
+				following[mine] = following.get(mine, 0) + (count << shift)
+			moves.append((state, safe, mine))
+		held += len(current) * (t + 1)
+		if held > budget:
+			return None
+		layers.append((current, moves))
+		current = following
+		active = after
+
+	# Walk back, counting the ways to finish from every state, and join
+	# them with the ways to reach it to count each cell as a mine.
+	cell_counts = [0] * size
+	finish = {(): 1} if () in current else dict()
+	for t in range(size - 1, -1, -1):
+		reach, moves = layers[t]
+		before = dict()
+		mined = dict()
+		for state, safe, mine in moves:
+			value = finish.get(safe, 0) if safe is not None else 0
+			if mine is not None and mine in finish:
+				value += finish[mine] << shift
+				mined[mine] = mined.get(mine, 0) + reach[state]
+			if value:
+				before[state] = value
+		cell_counts[t] = sum(count * finish[state] for state, count in mined.items()) << shift
+		finish = before
+	totals = unpack(finish.get((), 0), 0, size + 1, width)
+	used = [k for k, count in enumerate(totals) if count] or [0]
+	# Only mine counts some solution uses can be non-zero for a cell.
+	low, high = used[0], used[-1] + 1
+	cell_totals = dict()
+	for p, c in enumerate(cells):
+		cell_totals[c] = [0] * low + unpack(cell_counts[p], low, high, width) + [0] * (size + 1 - high)
+	return Component(cells, totals, cell_totals)
+
+
+def estimate(cells, members, needs):
+	"""Stands in for a component too large to count.
+
+	Every cell starts with the mean share of the mines its numbers still
+	need. Each number in turn then scales its cells' chances so they add up
+	to its need, sweeping over the numbers until the chances settle. The
+	component's mine count is taken to be binomial around the sum of the
+	chances, so it can still be combined with the mines left on the rest of
+	the board, and a cell's chance at k mines is its chance scaled by k over
+	that sum.
+
+	Args:
+		cells (int[]): Frontier cells in the component.
+		members (int[][]): Positions in cells of every number's cells.
+		needs (int[]): Mines each number still needs among its cells.
+
+	Returns:
+		component (Component): Made up counts giving those chances.
+	"""
+	shares = [list() for _ in cells]
+	for group, need in zip(members, needs):
+		for p in group:
+			shares[p].append(need / len(group))
+	chances = [sum(share) / len(share) for share in shares]
+	for _ in range(ESTIMATE_ROUNDS):
+		moved = 0.0
+		for group, need in zip(members, needs):
+			total = sum(chances[p] for p in group)
+			for p in group:
+				chance = min(1.0, chances[p] * need / total) if total else need / len(group)
+				moved = max(moved, abs(chance - chances[p]))
+				chances[p] = chance
+		if moved < ESTIMATE_TOLERANCE:
+			break
+	size = len(cells)
+	expected = sum(chances)
+	p = min(max(expected / size, 1e-9), 1 - 1e-9)
+	logs = [lgamma(size + 1) - lgamma(k + 1) - lgamma(size - k + 1) + k * log(p) + (size - k) * log(1 - p) for k in range(size + 1)]
+	top = max(logs)
+	totals = [exp(value - top) for value in logs]
+	totals = [weight if weight >= ESTIMATE_CUTOFF else 0.0 for weight in totals]
+	used = [k for k, weight in enumerate(totals) if weight]
+	low, high = used[0], used[-1] + 1
+	del totals[high:]
+	cell_totals = dict()
+	for c, chance in zip(cells, chances):
+		scale = chance / expected if expected else 0.0
+		cell_totals[c] = [0.0] * low + [totals[k] * min(1.0, scale * k) for k in range(low, high)]
+	return Component(cells, totals, cell_totals, exact=False)
+
+
+def convolve(a, b):
+	result = [0.0] * (len(a) + len(b) - 1)
+	for i, x in enumerate(a):
+		if x:
+			for j, y in enumerate(b):
+				result[i+j] += x * y
+	return result
+
+
+def normalise(values):
+	"""Divides values by the largest, the scale cancels out of every ratio."""
+	top = max(values, default=0.0)
+	if top == 0.0:
+		return values
+	return [value / top for value in values]
+
+
+def tilt(weights, low, log_odds):
+	"""Multiplies a component's weights by odds**k and rescales them.
+
+	Tilting the components and the rest of the board by opposite powers of
+	the board's mine odds leaves every product unchanged but keeps the terms
+	that matter within the range of a float.
+
+	Args:
+		weights (float[]): Component weights from low mines on.
+		low (int): Mines of the first weight.
+		log_odds (float): Log of the odds a covered cell is a mine.
+
+	Returns:
+		tilted (float[]): The tilted weights, the largest being 1.
+	"""
+	logs = [log(w) + (low + a) * log_odds if w > 0.0 else None for a, w in enumerate(weights)]
+	top = max((value for value in logs if value is not None), default=0.0)
+	return [exp(value - top) if value is not None else 0.0 for value in logs]
+
+
+class Probability:
+	"""Probability keeps the frontier of a board and answers mine odds.
+
+	Attributes:
+		model (Model): Board being analysed. Only read, never changed.
+		constraints (set): Revealed numbers that may still touch covered cells.
+		cache (dict): Components counted so far, keyed on cells and numbers.
+		hits (int): Components served from the cache.
+		misses (int): Components counted.
+		approximate (int): Components of the last call that were estimated.
+
+	"""
+	def __init__(self, model):
+		self.model = model
+		self.constraints = set()
+		self.cache = dict()
+		self.hits = 0
+		self.misses = 0
+		self.approximate = 0
+		covered = model.covered
+		self.update(i for i in range(model.size) if not covered[i])
+
+	def update(self, cells):
+		"""Records the cells revealed by the last move.
+
+		Args:
+			cells (int[]): Flat indices revealed by the move.
+		"""
+		number = self.model.number
+		for c in cells:
+			if number[c]:
+				self.constraints.add(c)
+
+	def components(self):
+		"""Fixes the cells single numbers force and splits the rest of the frontier.
+
+		Returns:
+			result ((list, set, set)): Cells in breadth first order,
+				constraints, the mines each constraint still needs and the
+				positions in cells of each constraint's cells for every
+				component, then the cells forced to be mines and the cells
+				forced to be safe.
+		"""
+		model = self.model
+		covered = model.covered
+		unknown = dict()
+		need = dict()
+		owners = dict()
+		for c in list(self.constraints):
+			touched = [n for n in model.neighbours(c) if covered[n]]
+			if not touched:
+				self.constraints.discard(c)
+				continue
+			unknown[c] = set(touched)
+			need[c] = model.number[c]
+			for n in touched:
+				owners.setdefault(n, list()).append(c)
+
+		mines = set()
+		safe = set()
+		queue = list(unknown)
+		while queue:
+			c = queue.pop()
+			cells = unknown[c]
+			if not cells or 0 < need[c] < len(cells):
+				continue
+			if need[c] < 0 or need[c] > len(cells):
+				# The board contradicts itself, leave it to the count.
+				continue
+			found = mines if need[c] else safe
+			for n in list(cells):
+				found.add(n)
+				for d in owners[n]:
+					unknown[d].discard(n)
+					if found is mines:
+						need[d] -= 1
+					queue.append(d)
+
+		seen = set()
+		result = list()
+		for root in owners:
+			if root in seen or root in mines or root in safe:
+				continue
+			seen.add(root)
+			cells = [root]
+			constraints = set()
+			for cell in cells:
+				for c in owners[cell]:
+					if c in constraints:
+						continue
+					constraints.add(c)
+					for n in unknown[c]:
+						if n not in seen:
+							seen.add(n)
+							cells.append(n)
+			constraints = sorted(constraints)
+			position = {n: p for p, n in enumerate(cells)}
+			members = [[position[n] for n in unknown[c]] for c in constraints]
+			result.append((cells, constraints, [need[c] for c in constraints], members))
+		return result, mines, safe
+
+	def component(self, cells, constraints, needs, members):
+		key = (tuple(sorted(cells)), tuple(constraints), tuple(needs))
+		found = self.cache.get(key)
+		if found is None:
+			self.misses += 1
+			order = band_order(cells, members)
+			rank = {p: r for r, p in enumerate(order)}
+			walked = [cells[p] for p in order]
+			walked_members = [[rank[p] for p in group] for group in members]
+			found = count_solutions(walked, walked_members, needs)
+			if found is None:
+				found = estimate(walked, walked_members, needs)
+			self.cache[key] = found
+		else:
+			self.hits += 1
+		return key, found
+
+	def probabilities(self):
+		"""Works out the chance that each covered cell is a mine.
+
+		The chances are exact up to float rounding unless a component had to
+		be estimated, see approximate.
+
+		Returns:
+			result ((dict, float)): Probability for every frontier cell, and
+				the probability shared by every covered cell off the frontier
+				(None when there are none).
+		"""
+		model = self.model
+		found, forced_mines, forced_safe = self.components()
+		parts = list()
+		keys = set()
+		for cells, constraints, needs, members in found:
+			key, part = self.component(cells, constraints, needs, members)
+			keys.add(key)
+			parts.append(part)
+		# Forget components the board no longer has.
+		for key in [key for key in self.cache if key not in keys]:
+			del self.cache[key]
+		self.approximate = sum(not part.exact for part in parts)
+
+		frontier = sum(len(part.cells) for part in parts)
+		rest = bytes(model.covered).count(1) - frontier - len(forced_mines) - len(forced_safe)
+		mines = len(model.bombs) - len(forced_mines)
+		if mines < 0 or mines > rest + frontier:
+			return dict(), None
+		density = min(max(mines / (rest + frontier), 1e-9), 1 - 1e-9) if rest + frontier else 0.5
+		log_odds = log(density / (1 - density))
+
+		# Ways to place the other mines off the frontier when the frontier
+		# holds u of them, for every u, tilted and rescaled.
+		logs = [None] * (mines + 1)
+		for u in range(max(0, mines - rest), mines + 1):
+			logs[u] = lgamma(rest + 1) - lgamma(mines - u + 1) - lgamma(rest - mines + u + 1) - u * log_odds
+		top = max(value for value in logs if value is not None)
+		outside = [exp(value - top) if value is not None else 0.0 for value in logs]
+
+		tilted = [tilt(part.weights, part.low, log_odds) for part in parts]
+		# Mines used by every component before each one, and with them their
+		# offsets, then the weight of the rest of the board as seen from
+		# each component onwards for every count of mines used before it.
+		before = [([1.0], 0)]
+		for part, weights in zip(parts, tilted):
+			values, offset = before[-1]
+			before.append((normalise(convolve(values, weights)), offset + part.low))
+		after = [outside]
+		for part, weights in zip(reversed(parts), reversed(tilted)):
+			following = after[-1]
+			low = part.low
+			after.append(normalise([sum(map(mul, weights, following[u+low:])) for u in range(mines + 1)]))
+		after.reverse()
+
+		result = dict.fromkeys(forced_mines, 1.0)
+		result.update(dict.fromkeys(forced_safe, 0.0))
+		for k, (part, weights) in enumerate(zip(parts, tilted)):
+			values, offset = before[k]
+			following = after[k+1]
+			start = offset + part.low
+			# Weight of everything else for each mine count of this part.
+			others = [sum(map(mul, values, following[start+a:])) for a in range(len(weights))]
+			total = sum(map(mul, weights, others))
+			if total == 0.0:
+				return dict(), None
+			scale = [o * w / plain if plain else 0.0 for o, w, plain in zip(others, weights, part.weights)]
+			for cell, counts in part.cell_weights.items():
+				result[cell] = sum(map(mul, counts, scale)) / total
+		other = None
+		if rest:
+			values, offset = before[-1]
+			weighted = [value * outside[offset + u] for u, value in enumerate(values) if offset + u <= mines]
+			total = sum(weighted)
+			if total == 0.0:
+				return dict(), None
+			other = sum(w * (mines - offset - u) for u, w in enumerate(weighted)) / (total * rest)
+		return result, other
@@ -0,0 +1,258 @@
+"""Move logs and headless score verification.
+
+Every game records its reveals and flags as fixed-size binary events with
+the milliseconds since the board was built. A finished log holds the game
+type, the time limit, the board itself in the Engine.dumps format (which
+carries the seed) and the events. Winning logs are stored in the replays
+table next to their score.
+
+The verifier plays a log back through the engine and checks that it ends in
+a win no later than the time limit, that no move came after the game ended,
+and that the claimed score is no more than the time left at the last move.
+
+Usage (from this folder):
+	python Replay.py                          audit highscores.db on every core
+	python Replay.py --database other.db --workers 4 --show 20
+"""
+
+import argparse
+import os
+import pathlib
+import sqlite3
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import Engine
+
+REVEAL = 1
+FLAG = 2
+
+# Log header: magic, format version, game tag, time limit in seconds and
+# length of the board that follows. Events follow the board.
+MAGIC = b"MSRL"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sBBII")
+# Event: kind, flat cell index and milliseconds since the board was built.
+EVENT = struct.Struct("<BII")
+GAME_TAGS = {"normal": 0, "hex": 1, "colour": 2}
+TAG_GAMES = {tag: game for game, tag in GAME_TAGS.items()}
+MODELS = {"normal": Engine.Model, "hex": Engine.Model, "colour": Engine.ColourModel}
+# Logs handed to each worker at a time during an audit.
+CHUNK = 256
+
+
+class Recorder:
+	"""Recorder collects the moves of one game as it is played.
+
+	Attributes:
+		game (str): Game type, a key of GAME_TAGS.
+		time_limit (int): Seconds the player had.
+		started (float): time.monotonic() when the board was built, moved back
+			by the time already played for a resumed game.
+		events (bytearray): Packed events so far.
+
+	"""
+	def __init__(self, game, time_limit, events=b"", elapsed_ms=0):
+		"""Recorder setup.
+
+		Args:
+			game (str): Game type, a key of GAME_TAGS.
+			time_limit (int): Seconds the player had.
+			events (bytes): Moves already made, for a resumed game.
+			elapsed_ms (int): Milliseconds already played, for a resumed game.
+		"""
+		self.game = game
+		self.time_limit = time_limit
+		self.resumed = time.monotonic()
+		self.offset = elapsed_ms
+		self.started = self.resumed - elapsed_ms / 1000
+		self.events = bytearray(events)
+
+	def elapsed_ms(self, now=None):
+		"""Milliseconds played so far.
+
+		Counted from the moment of the resume and added to the milliseconds
+		saved, so a stamp after a resume is never below one made before it.
+
+		Args:
+			now (float): time.monotonic() to measure at, the current time when None.
+		"""
+		if now is None:
+			now = time.monotonic()
+		return self.offset + int((now - self.resumed) * 1000)
+
+	def record(self, kind, i):
+		"""Appends a move.
+
+		Args:
+			kind (int): REVEAL or FLAG.
+			i (int): Flat index of the cell.
+		"""
+		self.events += EVENT.pack(kind, i, self.elapsed_ms())
+
+	def finish(self, model):
+		"""Builds the log once the game is over.
+
+		The board is saved here rather than at the start because no-guess
+		games only place their bombs on the first click.
+
+		Args:
+			model (Model): The board that was played.
+
+		Returns:
+			log (bytes): Header, board and events.
+		"""
+		board = Engine.dumps(model)
+		return HEADER.pack(MAGIC, FORMAT_VERSION, GAME_TAGS[self.game], self.time_limit, len(board)) + bytes(board) + bytes(self.events)
+
+
+def score_at(time_limit, elapsed_ms):
+	"""Score earned by finishing elapsed_ms after the board was built."""
+	return max(0, time_limit - elapsed_ms // 1000)
+
+
+def parse(log):
+	"""Splits a log into its parts without copying.
+
+	Args:
+		log (bytes): A log made by Recorder.finish.
+
+	Returns:
+		log ((str, int, memoryview, memoryview)): Game type, time limit,
+			the board and the events.
+
+	Raises:
+		ValueError: If the log is malformed.
+	"""
+	view = memoryview(log)
+	if len(view) < HEADER.size:
+		raise ValueError("log is too short for its header")
+	magic, version, tag, time_limit, length = HEADER.unpack_from(view)
+	if magic != MAGIC or version != FORMAT_VERSION or tag not in TAG_GAMES:
+		raise ValueError("not a version {} log".format(FORMAT_VERSION))
+	events = view[HEADER.size + length:]
+	if len(events) % EVENT.size:
+		raise ValueError("log ends inside an event")
+	return TAG_GAMES[tag], time_limit, view[HEADER.size:HEADER.size + length], events
+
+
+def verify(log, row):
+	"""Replays a log and checks it against the score it was stored with.
+
+	Args:
+		log (bytes): The game's log.
+		row (tuple): Game, level, player, size_x, size_y, bombs and score
+			from the scores table.
+
+	Returns:
+		result ((bool, str)): Whether the score stands, and why not.
+	"""
+	game, _, _, size_x, size_y, bombs, score = row
+	try:
+		logged_game, time_limit, board, events = parse(log)
+		model = Engine.loads(board, MODELS[logged_game])
+	except ValueError as error:
+		return False, str(error)
+	if (logged_game, model.size_x, model.size_y, len(model.bombs)) != (game, size_x, size_y, bombs):
+		return False, "board does not match the score"
+	won = False
+	last = 0
+	for kind, i, stamp in EVENT.iter_unpack(events):
+		if won or model.exploded:
+			return False, "move after the game ended"
+		if i >= model.size or stamp < last:
+			return False, "impossible move"
+		last = stamp
+		if kind == REVEAL:
+			model.reveal(i)
+		elif kind == FLAG:
+			model.add_flag(i)
+		else:
+			return False, "unknown event"
+		won = not model.exploded and model.check_game()
+	if not won:
+		return False, "log does not end in a win"
+	if last > time_limit * 1000:
+		return False, "won after the time ran out"
+	if score > score_at(time_limit, last):
+		return False, "score is more than the time left"
+	return True, ""
+
+
+def verify_batch(items):
+	"""Verifies (rowid, log, row) items in a worker.
+
+	Returns:
+		failures ((int, str)[]): Rowid and reason of every failed score.
+	"""
+	failures = list()
+	for rowid, log, row in items:
+		ok, reason = verify(log, row)
+		if not ok:
+			failures.append((rowid, reason))
+	return failures
+
+
+def audit(path, workers=None):
+	"""Verifies every score in a database that has a replay.
+
+	The database is opened read-only. Logs are handed to the workers a chunk
+	at a time as they are fetched, with at most two chunks per worker in
+	flight, so memory does not grow with the size of the table.
+
+	Args:
+		path (str): High score database.
+		workers (int): Processes, every core when None.
+
+	Returns:
+		result ((int, int, (int, str)[], float)): Scores checked, scores
+			without a replay, failures, and seconds taken.
+	"""
+	database = sqlite3.connect(pathlib.Path(path).resolve().as_uri() + "?mode=ro", uri=True)
+	start = time.perf_counter()
+	checked = 0
+	failures = list()
+	if not database.execute("SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name = 'replays'").fetchone()[0]:
+		missing = database.execute("SELECT count(*) FROM scores").fetchone()[0]
+		database.close()
+		return checked, missing, failures, time.perf_counter() - start
+	missing = database.execute("SELECT count(*) FROM scores WHERE rowid NOT IN (SELECT score_id FROM replays)").fetchone()[0]
+	rows = database.execute(
+		"SELECT scores.rowid, replays.log, game, level, player, size_x, size_y, bombs, scores.score "
+		"FROM scores JOIN replays ON replays.score_id = scores.rowid")
+	limit = 2 * (workers or os.cpu_count() or 1)
+	with ProcessPoolExecutor(workers) as executor:
+		pending = set()
+		while True:
+			fetched = rows.fetchmany(CHUNK)
+			if not fetched:
+				break
+			checked += len(fetched)
+			pending.add(executor.submit(verify_batch, [(r[0], r[1], r[2:]) for r in fetched]))
+			if len(pending) >= limit:
+				done, pending = wait(pending, return_when=FIRST_COMPLETED)
+				for future in done:
+					failures.extend(future.result())
+		for future in pending:
+			failures.extend(future.result())
+	database.close()
+	failures.sort()
+	return checked, missing, failures, time.perf_counter() - start
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Verify stored scores by replaying their logs")
+	parser.add_argument("--database", default="highscores.db")
+	parser.add_argument("--workers", type=int, default=os.cpu_count())
+	parser.add_argument("--show", type=int, default=10, help="failures to list")
+	args = parser.parse_args(argv)
+	checked, missing, failures, elapsed = audit(args.database, args.workers)
+	print("{} scores replayed in {:.2f}s ({:.0f}/s), {} failed, {} without a replay".format(
+		checked, elapsed, checked / elapsed if elapsed else 0, len(failures), missing))
+	for rowid, reason in failures[:args.show]:
+		print("  score {}: {}".format(rowid, reason))
+
+
+if __name__ == "__main__":
+	main()
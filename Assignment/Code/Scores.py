@@ -0,0 +1,304 @@
+"""High score storage.
+
+Scores are read one page at a time for a single game type and level. The
+index on (game, level, score) holds the rowid of every entry, so a page is
+one range scan of the index in score order whatever the size of the table,
+and the next page starts from the last (score, rowid) seen instead of an
+OFFSET that would walk every earlier row again.
+
+Scores are written by a ScoreWriter on its own thread and connection. The
+database is kept in WAL mode so the reading connection on the Tk thread
+never waits for a write to finish.
+
+The best scores of each game and level are also kept in memory by a
+Leaderboard, which the writer tells about every score it commits.
+"""
+
+import heapq
+import logging
+import queue
+import sqlite3
+import threading
+
+PAGE = 50
+# Put on the queue to make the writer finish what it has and stop.
+STOP = None
+
+log = logging.getLogger(__name__)
+
+SCHEMA = (
+	"CREATE TABLE IF NOT EXISTS scores (game text, level integer, player text, size_x integer, size_y integer, bombs integer, score integer)",
+	"CREATE INDEX IF NOT EXISTS scores_rank ON scores (game, level, score)",
+	"CREATE TABLE IF NOT EXISTS replays (score_id integer PRIMARY KEY, log blob)",
+)
+
+
+def prepare(database):
+	"""Switches the database to WAL and creates the table and index if missing.
+
+	Building the index on an existing table is a one-off scan the first time
+	the new version opens it. WAL mode is stored in the file, so it holds for
+	every connection opened afterwards.
+
+	Args:
+		database (Connection): High score database.
+	"""
+	database.execute("PRAGMA journal_mode=WAL")
+	for statement in SCHEMA:
+		database.execute(statement)
+	database.commit()
+
+
+def top_scores(database, game, level, after=None, limit=PAGE):
+	"""Reads one page of scores, best first.
+
+	Args:
+		database (Connection): High score database.
+		game (str): Game type, as stored by the boards.
+		level (str): Level name.
+		after ((int, int)): Score and rowid of the last entry of the previous
+			page, None for the first page.
+		limit (int): Entries per page.
+
+	Returns:
+		rows ((int, str, int)[]): Rowid, player and score of each entry.
+	"""
+	if after is None:
+		return database.execute(
+			"SELECT rowid, player, score FROM scores WHERE game = ? AND level = ? "
+			"ORDER BY score DESC, rowid DESC LIMIT ?", (game, level, limit)).fetchall()
+	return database.execute(
+		"SELECT rowid, player, score FROM scores WHERE game = ? AND level = ? AND (score, rowid) < (?, ?) "
+		"ORDER BY score DESC, rowid DESC LIMIT ?", (game, level, after[0], after[1], limit)).fetchall()
+
+
+class ScoreWriter:
+	"""ScoreWriter saves scores on a background thread.
+
+	Scores are queued by the boards and written by the thread in batches: one
+	transaction holds every score queued while the previous one committed. A
+	score's move log, when given, goes into the replays table keyed by the
+	score's rowid in the same transaction. When a batch fails its scores are
+	retried one at a time, any that still fail are logged and dropped, and
+	the thread carries on with the next batch.
+
+	Attributes:
+		path (str): File of the high score database.
+		queue (Queue): Rows and logs waiting to be written, STOP to finish.
+		thread (Thread): The writer, owning its own connection.
+		written (int): Rows committed so far.
+		failed (int): Rows dropped because their batch failed.
+		listeners (function[]): Called on the writer thread with the row and
+			its rowid for every row committed.
+
+	"""
+	def __init__(self, path):
+		"""Starts the writer thread.
+
+		The schema should already exist, see prepare.
+
+		Args:
+			path (str): File of the high score database.
+		"""
+		self.path = path
+		self.queue = queue.Queue()
+		self.written = 0
+		self.failed = 0
+		self.listeners = list()
+		self.thread = threading.Thread(target=self.run, name="ScoreWriter", daemon=True)
+		self.thread.start()
+
+	def add(self, row, log=None):
+		"""Queues a score without waiting for it to be written.
+
+		Args:
+			row (tuple): Game, level, player, size_x, size_y, bombs and score.
+			log (bytes): Move log of the game, see Replay.
+		"""
+		self.queue.put((row, log))
+
+	def run(self):
+		database = sqlite3.connect(self.path)
+		stopping = False
+		while not stopping:
+			batch = list()
+			item = self.queue.get()
+			while True:
+				if item is STOP:
+					stopping = True
+					break
+				batch.append(item)
+				try:
+					item = self.queue.get_nowait()
+				except queue.Empty:
+					break
+			if batch:
+				try:
+					saved = list(zip(batch, self.write(database, batch)))
+				except Exception:
+					saved = list()
+					for item in batch:
+						try:
+							saved.append((item, self.write(database, [item])[0]))
+						except Exception:
+							self.failed += 1
+							log.exception("ScoreWriter dropped score %r", item[0])
+				self.written += len(saved)
+				for (row, _), rowid in saved:
+					for listener in self.listeners:
+						try:
+							listener(row, rowid)
+						except Exception:
+							log.exception("ScoreWriter listener failed")
+		database.close()
+
+	def write(self, database, batch):
+		"""Inserts a batch of scores and their logs in one transaction.
+
+		Returns:
+			rowids (int[]): Rowid given to each score.
+		"""
+		rowids = list()
+		with database:
+			for row, replay in batch:
+				rowid = database.execute("INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?, ?)", row).lastrowid
+				if replay is not None:
+					database.execute("INSERT INTO replays (score_id, log) VALUES (?, ?)", (rowid, replay))
+				rowids.append(rowid)
+		return rowids
+
+	def close(self):
+		"""Writes every queued score and stops the thread."""
+		self.queue.put(STOP)
+		self.thread.join()
+
+
+class Leaderboard:
+	"""Leaderboard keeps the best scores of every game and level in memory.
+
+	Each game and level is read from the database the first time it is asked
+	for, then kept as a min-heap of its best entries and updated by the
+	writer as scores are committed, so later reads need no query.
+
+	Other processes may write to the same file. Every read compares the
+	connection's PRAGMA data_version, which changes when another connection
+	commits. The writer is another connection too, so on a change the rows
+	past the last rowid checked are counted, and the change is only put down
+	to the writer when they are exactly the rows it reported since. Anything
+	else drops every cached board. Scores are only ever appended, so every
+	foreign insert lands past the last rowid checked.
+
+	Attributes:
+		database (Connection): Reading connection, used on the Tk thread only.
+		size (int): Entries kept for each game and level.
+		boards (dict): (game, level) to a min-heap of (score, rowid, player).
+		rowids (dict): (game, level) to the rowids in its heap.
+		hits (int): Reads served from memory.
+		misses (int): Reads that had to query the database.
+		invalidations (int): Times the cache was dropped for a foreign write.
+		checked (int): Largest rowid accounted for at the last check.
+		reported (int[]): Rowids the writer committed past checked.
+
+	"""
+	def __init__(self, database, writer, size=PAGE):
+		"""Leaderboard setup.
+
+		Args:
+			database (Connection): Reading connection.
+			writer (ScoreWriter): Writer whose commits keep the cache current.
+			size (int): Entries kept for each game and level.
+		"""
+		self.database = database
+		self.size = size
+		self.boards = dict()
+		self.rowids = dict()
+		self.hits = 0
+		self.misses = 0
+		self.invalidations = 0
+		self.lock = threading.Lock()
+		self.version = self.data_version()
+		self.checked = self.largest_rowid()
+		self.reported = list()
+		writer.listeners.append(self.saved)
+
+	def data_version(self):
+		return self.database.execute("PRAGMA data_version").fetchone()[0]
+
+	def largest_rowid(self):
+		return self.database.execute("SELECT max(rowid) FROM scores").fetchone()[0] or 0
+
+	def push(self, key, score, rowid, player):
+		"""Adds an entry to a cached board if it makes the top."""
+		heap = self.boards[key]
+		rowids = self.rowids[key]
+		if rowid in rowids:
+			return
+		entry = (score, rowid, player)
+		if len(heap) < self.size:
+			heapq.heappush(heap, entry)
+		elif entry > heap[0]:
+			rowids.discard(heapq.heapreplace(heap, entry)[1])
+		else:
+			return
+		rowids.add(rowid)
+
+	def saved(self, row, rowid):
+		"""Writer listener, runs on the writer thread after each commit."""
+		game, level, player, _, _, _, score = row
+		key = (game, level)
+		with self.lock:
+			self.reported.append(rowid)
+			if key in self.boards:
+				self.push(key, score, rowid, player)
+
+	def validate(self):
+		"""Drops every cached board if another process wrote to the database."""
+		version = self.data_version()
+		if version == self.version:
+			return
+		self.version = version
+		with self.lock:
+			seen = len(self.reported)
+		# Rows the writer commits from here on may or may not be counted, at
+		# worst that drops the cache for nothing.
+		count, largest = self.database.execute(
+			"SELECT count(*), max(rowid) FROM scores WHERE rowid > ?", (self.checked,)).fetchone()
+		with self.lock:
+			if count != seen:
+				self.boards.clear()
+				self.rowids.clear()
+				self.invalidations += 1
+			if largest is not None:
+				self.checked = largest
+			self.reported = [rowid for rowid in self.reported[seen:] if rowid > self.checked]
+
+	def top(self, game, level):
+		"""Best scores of a game and level, best first.
+
+		Args:
+			game (str): Game type, as stored by the boards.
+			level (str): Level name.
+
+		Returns:
+			rows ((int, str, int)[]): Rowid, player and score of each entry,
+				the same rows top_scores gives for the first page.
+		"""
+		self.validate()
+		key = (game, level)
+		with self.lock:
+			heap = self.boards.get(key)
+			if heap is not None:
+				self.hits += 1
+				return [(rowid, player, score) for score, rowid, player in sorted(heap, reverse=True)]
+		self.misses += 1
+		# The board exists before the query so scores the writer commits
+		# meanwhile are pushed onto it, push skips the ones the query sees too.
+		with self.lock:
+			self.boards[key] = list()
+			self.rowids[key] = set()
+		rows = top_scores(self.database, game, level, limit=self.size)
+		with self.lock:
+			for rowid, player, score in rows:
+				self.push(key, score, rowid, player)
+			heap = self.boards[key]
+			return [(rowid, player, score) for score, rowid, player in sorted(heap, reverse=True)]
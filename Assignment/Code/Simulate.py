@@ -0,0 +1,260 @@
+"""Headless mass simulation of games played by bots.
+
+Games are split into chunks and the chunks are played across every core by a
+multiprocessing pool. Each chunk has its own seed derived from the base seed
+and the chunk number, so a run is reproducible whatever the number of
+workers. Only per-chunk totals travel back to the parent, which streams
+running aggregates as CSV or JSON lines as chunks finish.
+
+Bots:
+	random    reveals a random covered cell every move.
+	solver    reveals cells Solver proves safe, guesses at random when stuck.
+	greedy    like solver, but guesses the cell Probability rates least
+	          likely to be a mine.
+
+Colour games hide the numbers, so only the random bot can play them.
+
+Usage (from this folder):
+	python Simulate.py --mode normal --level Hard --bot solver --games 100000
+	python Simulate.py --mode hex --size 30 30 --bombs 150 --format json -o hex.jsonl
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+import Engine
+import Solver
+import Probability
+
+TOPOLOGIES = {"normal": Engine.SQUARE, "hex": Engine.HEX, "colour": Engine.HEX}
+BOTS = ("random", "solver", "greedy")
+FIELDS = ("chunks", "games", "wins", "win_rate", "moves", "revealed", "ms_per_game", "games_per_s")
+
+
+def new_model(mode, size_x, size_y, bombs, rng):
+	"""Builds a board with its bombs drawn from rng."""
+	if mode == "colour":
+		model = Engine.ColourModel(size_x, size_y, Engine.HEX)
+	else:
+		model = Engine.Model(size_x, size_y, TOPOLOGIES[mode])
+	model.set_bombs(rng.sample(range(model.size), bombs))
+	return model
+
+
+def pick_random(model, cells, rng):
+	"""Removes random cells from cells until one can still be revealed.
+
+	Args:
+		model (Model): The board.
+		cells (int[]): Candidate cells, changed in place.
+		rng (Random): Source of the choice.
+
+	Returns:
+		cell (int): Flat index to reveal, None when nothing is left.
+	"""
+	# Colour bombs stay covered once painted, so painted is the test there.
+	painted = model.colour
+	while cells:
+		k = rng.randrange(len(cells))
+		cells[k], cells[-1] = cells[-1], cells[k]
+		i = cells.pop()
+		if model.covered[i] and not painted[i]:
+			return i
+	return None
+
+
+def play_random(model, rng):
+	"""Plays random moves until the game is won or lost.
+
+	Returns:
+		moves (int): Cells clicked.
+	"""
+	cells = list(range(model.size))
+	moves = 0
+	while not model.exploded and not model.check_game():
+		i = pick_random(model, cells, rng)
+		if i is None:
+			break
+		model.reveal(i)
+		moves += 1
+	return moves
+
+
+def play_solver(model, rng, greedy=False):
+	"""Plays proven moves, guessing only when the solver is stuck.
+
+	Args:
+		model (Model): Fresh board with its bombs placed.
+		rng (Random): Source of random guesses.
+		greedy (bool): Guess the lowest mine probability instead of at random.
+
+	Returns:
+		moves (int): Cells clicked.
+	"""
+	cells = list(range(model.size))
+	solver = Solver.Solver(model)
+	odds = Probability.Probability(model) if greedy else None
+	moves = 0
+	while not model.exploded and not model.check_game():
+		safe, _ = solver.solve()
+		if safe:
+			i = safe.pop()
+		elif greedy:
+			i = guess(model, solver, odds, cells, rng)
+		else:
+			i = pick_random(model, cells, rng)
+			while i is not None and solver.state[i] == Solver.MINE:
+				i = pick_random(model, cells, rng)
+		if i is None:
+			break
+		changed = model.reveal(i)
+		moves += 1
+		solver.update(changed)
+		if odds is not None:
+			odds.update(changed)
+	return moves
+
+
+def guess(model, solver, odds, cells, rng):
+	"""Picks the covered cell least likely to be a mine.
+
+	Cells off the frontier share one probability, so one of them is drawn at
+	random when they are the best choice.
+
+	Returns:
+		cell (int): Flat index to reveal, None when nothing is left.
+	"""
+	chances, other = odds.probabilities()
+	best = None
+	best_chance = 2.0
+	for cell, chance in chances.items():
+		if chance < best_chance and solver.state[cell] != Solver.MINE:
+			best, best_chance = cell, chance
+	if other is not None and other < best_chance:
+		frontier = chances.keys()
+		i = pick_random(model, cells, rng)
+		while i is not None and (i in frontier or solver.state[i] == Solver.MINE):
+			i = pick_random(model, cells, rng)
+		if i is not None:
+			return i
+	return best
+
+
+def play_chunk(task):
+	"""Plays one chunk of games in a worker.
+
+	Args:
+		task (tuple): Mode, size_x, size_y, bombs, bot, base seed, chunk
+			number and games in the chunk.
+
+	Returns:
+		totals (dict): Games, wins, moves, revealed cells and seconds.
+	"""
+	mode, size_x, size_y, bombs, bot, seed, chunk, games = task
+	rng = random.Random("{}:{}".format(seed, chunk))
+	totals = {"games": games, "wins": 0, "moves": 0, "revealed": 0, "seconds": 0.0}
+	for _ in range(games):
+		start = time.perf_counter()
+		model = new_model(mode, size_x, size_y, bombs, rng)
+		if bot == "random":
+			moves = play_random(model, rng)
+		else:
+			moves = play_solver(model, rng, greedy=bot == "greedy")
+		totals["seconds"] += time.perf_counter() - start
+		totals["wins"] += not model.exploded and model.check_game()
+		totals["moves"] += moves
+		totals["revealed"] += model.revealed
+	return totals
+
+
+def aggregate(totals, chunks, elapsed):
+	"""Turns running totals into the row that is streamed out."""
+	games = totals["games"]
+	return {
+		"chunks": chunks,
+		"games": games,
+		"wins": totals["wins"],
+		"win_rate": round(totals["wins"] / games, 6),
+		"moves": round(totals["moves"] / games, 3),
+		"revealed": round(totals["revealed"] / games, 3),
+		"ms_per_game": round(totals["seconds"] * 1000 / games, 4),
+		"games_per_s": round(games / elapsed, 1),
+	}
+
+
+def simulate(args, output):
+	"""Runs every chunk across the pool and streams aggregates to output."""
+	tasks = list()
+	left = args.games
+	chunk = 0
+	while left > 0:
+		games = min(args.chunk, left)
+		tasks.append((args.mode, args.size[0], args.size[1], args.bombs, args.bot, args.seed, chunk, games))
+		left -= games
+		chunk += 1
+	if args.format == "csv":
+		writer = csv.DictWriter(output, FIELDS)
+		writer.writeheader()
+		emit = writer.writerow
+	else:
+		emit = lambda row: output.write(json.dumps(row) + "\n")
+	totals = {"games": 0, "wins": 0, "moves": 0, "revealed": 0, "seconds": 0.0}
+	start = time.perf_counter()
+	row = None
+	with Pool(args.workers) as pool:
+		for done, result in enumerate(pool.imap_unordered(play_chunk, tasks), 1):
+			for key, value in result.items():
+				totals[key] += value
+			row = aggregate(totals, done, time.perf_counter() - start)
+			if done % args.every == 0 or done == len(tasks):
+				emit(row)
+				output.flush()
+	return row
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Play many headless games with a bot")
+	parser.add_argument("--mode", choices=sorted(TOPOLOGIES), default="normal")
+	parser.add_argument("--level", choices=list(Engine.PRESETS["normal"]), default="Easy")
+	parser.add_argument("--size", type=int, nargs=2, metavar=("X", "Y"), help="board size, overrides the level")
+	parser.add_argument("--bombs", type=int, help="bomb count, overrides the level")
+	parser.add_argument("--bot", choices=BOTS, default="solver")
+	parser.add_argument("--games", type=int, default=10000)
+	parser.add_argument("--chunk", type=int, default=500, help="games per work unit")
+	parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes, every core by default")
+	parser.add_argument("--seed", type=int, default=0, help="base seed, chunk n uses seed:n")
+	parser.add_argument("--format", choices=("csv", "json"), default="csv")
+	parser.add_argument("--every", type=int, default=1, help="emit a row every n finished chunks")
+	parser.add_argument("-o", "--output", help="file to write, stdout by default")
+	args = parser.parse_args(argv)
+
+	x, y, bombs, _ = Engine.PRESETS[args.mode][args.level]
+	if args.size is None:
+		args.size = (x, y)
+	if args.bombs is None:
+		args.bombs = bombs
+	if args.mode == "colour" and args.bot != "random":
+		parser.error("colour games hide the numbers, only the random bot can play them")
+	if not 0 < args.bombs < args.size[0] * args.size[1]:
+		parser.error("bombs must leave at least one safe cell")
+	if args.games < 1 or args.chunk < 1 or args.every < 1:
+		parser.error("games, chunk and every must be positive")
+
+	if args.output:
+		with open(args.output, "w", newline="") as output:
+			row = simulate(args, output)
+	else:
+		row = simulate(args, sys.stdout)
+	print("{} {} {} on {}x{} with {} bombs: {:.2%} won, {:.0f} games/s".format(
+		args.games, args.bot, args.mode, args.size[0], args.size[1], args.bombs,
+		row["win_rate"], row["games_per_s"]), file=sys.stderr)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,199 @@
+"""Save and resume games through memory-mapped snapshot files.
+
+A snapshot is a header page, holding the header and the level name,
+followed by the model's cell arrays stored as page-aligned columns of one
+byte per cell (covered, flag, bomb, number and colour), the bomb indices as
+a column of 32-bit cells, and the game's move log at the end.
+
+Resuming maps the file copy-on-write and hands the model views of the
+columns instead of reading them, so the operating system only loads the
+pages the game touches and changes stay private to the process. Saving to a
+file of the same shape compares each page with what is already on disk and
+writes only the pages that differ, plus the header and the move log.
+
+All integers are little endian.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+import Engine
+import Replay
+
+MAGIC = b"MSSN"
+FORMAT_VERSION = 3
+PAGE = 4096
+# Header: magic, version, topology tag, game tag, level name length, size_x,
+# size_y, seed, mines, flag_count, revealed, flags_correct, flags_wrong,
+# safe_covered, exploded, time limit, milliseconds played and move log
+# length. The
+# level name follows it in UTF-8.
+HEADER = struct.Struct("<4sBBBBIIQIIIIIIBIII")
+COLUMNS = ("covered", "flag", "bomb", "number", "colour")
+
+
+def pages(length):
+	"""Bytes taken by a column once padded to whole pages."""
+	return -(-length // PAGE) * PAGE
+
+
+def layout(size, mines):
+	"""Works out where every column sits in the file.
+
+	Args:
+		size (int): Cells on the board.
+		mines (int): Bombs on the board.
+
+	Returns:
+		layout ((dict, int)): Offset and length of every column, including
+			"bombs", and the offset of the move log.
+	"""
+	offset = PAGE
+	columns = dict()
+	for name in COLUMNS:
+		columns[name] = (offset, size)
+		offset += pages(size)
+	columns["bombs"] = (offset, 4 * mines)
+	offset += pages(4 * mines)
+	return columns, offset
+
+
+def column_bytes(model, name):
+	"""Contents of a model column as a bytes-like object."""
+	if name == "bombs":
+		bombs = model.bombs
+		if isinstance(bombs, memoryview):
+			return bombs.cast('B')
+		packed = array('I', bombs)
+		if sys.byteorder == "big":
+			packed.byteswap()
+		return memoryview(packed).cast('B')
+	return memoryview(getattr(model, name))
+
+
+def save(path, model, game, level, time_limit, elapsed_ms, events=b""):
+	"""Saves a game, rewriting only the pages that changed.
+
+	Args:
+		path (str): Snapshot file.
+		model (Model): Board being played.
+		game (str): Game type, a key of Replay.GAME_TAGS.
+		level (str): Level name, at most 255 bytes in UTF-8.
+		time_limit (int): Seconds the player had at the start.
+		elapsed_ms (int): Milliseconds played, kept exact so the move log
+			carries on from the same clock on resume.
+		events (bytes): Move log so far, see Replay.Recorder.
+
+	Returns:
+		written (int): Pages written, header and move log included.
+
+	Raises:
+		ValueError: If the level name is too long to store.
+	"""
+	level_name = level.encode("utf-8")
+	if len(level_name) > 255:
+		raise ValueError("level name is longer than 255 bytes")
+	columns, events_offset = layout(model.size, len(model.bombs))
+	header = HEADER.pack(
+		MAGIC, FORMAT_VERSION, Engine.TOPOLOGY_TAGS[model.topology], Replay.GAME_TAGS[game],
+		len(level_name), model.size_x, model.size_y, model.seed,
+		len(model.bombs), model.flag_count, model.revealed, model.flags_correct, model.flags_wrong,
+		model.safe_covered, model.exploded, time_limit, elapsed_ms, len(events)) + level_name
+	written = 0
+	same_shape = False
+	if os.path.exists(path):
+		with open(path, "rb") as f:
+			old = f.read(HEADER.size)
+		if len(old) == HEADER.size:
+			old = HEADER.unpack(old)
+			same_shape = old[:7] == HEADER.unpack_from(header)[:7] and old[8] == len(model.bombs)
+	if not same_shape:
+		with open(path, "wb") as f:
+			f.write(header.ljust(PAGE, b"\0"))
+			for name in COLUMNS + ("bombs",):
+				data = column_bytes(model, name)
+				f.write(data)
+				f.write(bytes(pages(len(data)) - len(data)))
+			f.write(events)
+		return events_offset // PAGE + pages(len(events)) // PAGE
+
+	with open(path, "r+b") as f:
+		disk = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		try:
+			for name in COLUMNS + ("bombs",):
+				offset, length = columns[name]
+				data = column_bytes(model, name)
+				for start in range(0, length, PAGE):
+					end = min(start + PAGE, length)
+					if disk[offset + start:offset + end] != data[start:end]:
+						f.seek(offset + start)
+						f.write(data[start:end])
+						written += 1
+		finally:
+			disk.close()
+		f.seek(0)
+		f.write(header)
+		f.seek(events_offset)
+		f.write(events)
+		# Only cut a log that got shorter, a file still mapped by a resumed
+		# game cannot be resized on Windows.
+		if f.tell() < os.fstat(f.fileno()).st_size:
+			f.truncate()
+	return written + 1 + pages(len(events)) // PAGE
+
+
+def resume(path, validate=False):
+	"""Resumes a saved game without reading its columns.
+
+	Args:
+		path (str): Snapshot file.
+		validate (bool): Passed on to the model.
+
+	Returns:
+		saved (dict): The model and the game, level, time_limit, elapsed_ms
+			and events saved with it, and time_left worked out from them.
+
+	Raises:
+		ValueError: If the file is not a snapshot this version can read.
+	"""
+	with open(path, "rb") as f:
+		mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+	view = memoryview(mapping)
+	if len(view) < PAGE:
+		raise ValueError("snapshot is too short for its header")
+	(magic, version, topology, game, name_length, size_x, size_y, seed, mines, flag_count, revealed,
+		flags_correct, flags_wrong, safe_covered, exploded, time_limit, elapsed_ms, events_length) = HEADER.unpack_from(view)
+	if magic != MAGIC or version != FORMAT_VERSION:
+		raise ValueError("not a version {} snapshot".format(FORMAT_VERSION))
+	if topology not in Engine.TAG_TOPOLOGIES or game not in Replay.TAG_GAMES:
+		raise ValueError("unknown topology or game in snapshot")
+	columns, events_offset = layout(size_x * size_y, mines)
+	if len(view) != events_offset + events_length:
+		raise ValueError("snapshot should be {} bytes".format(events_offset + events_length))
+	buffers = {name: view[offset:offset + length] for name, (offset, length) in columns.items()}
+	if sys.byteorder == "big":
+		bombs = array('I', buffers["bombs"])
+		bombs.byteswap()
+		buffers["bombs"] = memoryview(bombs)
+	else:
+		buffers["bombs"] = buffers["bombs"].cast('I')
+	game = Replay.TAG_GAMES[game]
+	model = Replay.MODELS[game](size_x, size_y, Engine.TAG_TOPOLOGIES[topology], validate, seed, buffers)
+	model.flag_count = flag_count
+	model.revealed = revealed
+	model.flags_correct = flags_correct
+	model.flags_wrong = flags_wrong
+	model.safe_covered = safe_covered
+	model.exploded = bool(exploded)
+	return {
+		"model": model,
+		"game": game,
+		"level": str(view[HEADER.size:HEADER.size + name_length], "utf-8"),
+		"time_limit": time_limit,
+		"elapsed_ms": elapsed_ms,
+		"time_left": Replay.score_at(time_limit, elapsed_ms),
+		"events": bytes(view[events_offset:]),
+	}
@@ -0,0 +1,187 @@
+"""Deterministic constraint propagation solver.
+
+Works on the revealed state of any Engine.Model, square or hex, through the
+model's shared neighbour offsets. Every revealed number is a constraint on its
+covered neighbours. Constraints are kept on a worklist and only the ones a
+move or a deduction touched are examined again.
+"""
+
+from collections import deque
+
+UNKNOWN = 0
+SAFE = 1
+MINE = 2
+
+
+class Solver:
+	"""Solver finds provably safe cells and provable mines.
+
+	Two rules are applied: a single number whose remaining mines are zero or
+	equal to its unknown neighbours, and a pair of numbers where one's unknown
+	neighbours are a subset of the other's, so their difference holds a known
+	amount of mines.
+
+	Attributes:
+		model (Model): Board being solved. Only read, never changed.
+		state (bytearray): UNKNOWN, SAFE or MINE for every cell as deduced.
+		safe (set): Covered cells proven safe.
+		mines (set): Cells proven to be mines.
+
+	"""
+	def __init__(self, model):
+		"""Solver setup.
+
+		Every number already revealed is queued.
+
+		Args:
+			model (Model): Board to solve.
+		"""
+		self.model = model
+		self.state = bytearray(model.size)
+		self.safe = set()
+		self.mines = set()
+		self.queue = deque()
+		self.queued = bytearray(model.size)
+		covered = model.covered
+		self.update(i for i in range(model.size) if not covered[i])
+
+	def push(self, c):
+		model = self.model
+		if not self.queued[c] and not model.covered[c] and model.number[c]:
+			self.queued[c] = 1
+			self.queue.append(c)
+
+	def update(self, cells):
+		"""Queues the constraints touched by newly revealed cells.
+
+		Args:
+			cells (int[]): Flat indices revealed by the last move.
+		"""
+		model = self.model
+		neighbours = model.neighbours
+		covered = model.covered
+		for c in cells:
+			self.safe.discard(c)
+			if model.number[c]:
+				self.push(c)
+			for n in neighbours(c):
+				if not covered[n]:
+					self.push(n)
+
+	def unknowns(self, c):
+		"""Reads the constraint of a revealed number.
+
+		Args:
+			c (int): Flat index of a revealed cell.
+
+		Returns:
+			constraint ((int[], int)): Undecided covered neighbours and how
+				many mines are still among them.
+		"""
+		model = self.model
+		covered = model.covered
+		state = self.state
+		unknown = list()
+		need = model.number[c]
+		for n in model.neighbours(c):
+			if covered[n]:
+				if state[n] == MINE:
+					need -= 1
+				elif state[n] == UNKNOWN:
+					unknown.append(n)
+		return unknown, need
+
+	def mark(self, cells, value):
+		"""Records deduced cells and requeues the numbers around them."""
+		neighbours = self.model.neighbours
+		found = self.safe if value == SAFE else self.mines
+		for u in cells:
+			if self.state[u] != UNKNOWN:
+				continue
+			self.state[u] = value
+			found.add(u)
+			for n in neighbours(u):
+				self.push(n)
+
+	def solve(self):
+		"""Runs the worklist until no queued constraint yields anything new.
+
+		Returns:
+			result ((set, set)): Covered cells proven safe and cells proven
+				to be mines.
+		"""
+		queue = self.queue
+		queued = self.queued
+		while queue:
+			c = queue.popleft()
+			queued[c] = 0
+			unknown, need = self.unknowns(c)
+			if not unknown:
+				continue
+			if need == 0:
+				self.mark(unknown, SAFE)
+			elif need == len(unknown):
+				self.mark(unknown, MINE)
+			else:
+				self.subsets(c, unknown, need)
+		return self.safe, self.mines
+
+	def subsets(self, c, unknown, need):
+		"""Compares a constraint with every number sharing an unknown cell.
+
+		Args:
+			c (int): Flat index of the constraint's number.
+			unknown (int[]): Its undecided covered neighbours.
+			need (int): Mines still among them.
+		"""
+		model = self.model
+		neighbours = model.neighbours
+		covered = model.covered
+		mine = set(unknown)
+		seen = {c}
+		for u in unknown:
+			for b in neighbours(u):
+				if b in seen or covered[b] or not model.number[b]:
+					continue
+				seen.add(b)
+				other, other_need = self.unknowns(b)
+				theirs = set(other)
+				if mine <= theirs:
+					small, small_need, big, big_need = mine, need, theirs, other_need
+				elif theirs <= mine:
+					small, small_need, big, big_need = theirs, other_need, mine, need
+				else:
+					continue
+				rest = big - small
+				if not rest:
+					continue
+				if big_need == small_need:
+					self.mark(rest, SAFE)
+					return
+				if big_need - small_need == len(rest):
+					self.mark(rest, MINE)
+					return
+
+
+def solve_game(model, first):
+	"""Plays a game from a first click using only proven moves.
+
+	Args:
+		model (Model): Fresh board with its bombs placed.
+		first (int): Flat index of the first click.
+
+	Returns:
+		True if every safe cell was revealed without guessing, False if the
+		solver got stuck or the first click was a bomb.
+	"""
+	model.reveal(first)
+	if model.exploded:
+		return False
+	solver = Solver(model)
+	while model.safe_covered:
+		safe, _ = solver.solve()
+		if not safe:
+			return False
+		while safe:
+			solver.update(model.reveal(safe.pop()))
+	return True
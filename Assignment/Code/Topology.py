@@ -0,0 +1,134 @@
+"""Neighbourhoods of the square and offset column hex grids.
+
+Neighbour lookups are served from row templates built once for each
+(topology, size_x, size_y) and shared by every board of that shape. Only the
+first, last and inner rows differ, so a shape keeps three rows of relative
+offsets with the board edges already clipped. The neighbours of flat cell
+``i`` in row ``y`` and column ``x`` are ``i + d`` for every ``d`` in
+``rows[y][x]``, so hot loops need no parity or bounds checks, and the memory
+used grows with the width of the board rather than its area.
+
+count_masks serves the same neighbourhoods as whole-board shifts, used to
+count neighbouring bombs for every cell in one pass.
+"""
+
+from functools import lru_cache
+
+SQUARE = "square"
+HEX = "hex"
+
+# Offsets walked for each topology. Hex boards use offset columns where odd
+# columns sit half a cell lower than even ones.
+SQUARE_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+HEX_EVEN_OFFSETS = [(-1, -1), (-1, 0), (0, -1), (0, 1), (1, -1), (1, 0)]
+HEX_ODD_OFFSETS = [(-1, 0), (-1, 1), (0, -1), (0, 1), (1, 0), (1, 1)]
+
+
+def offsets(topology, x):
+	"""Neighbour offsets of a cell in column x.
+
+	Args:
+		topology (str): Either SQUARE or HEX.
+		x (int): x coordinate of the cell.
+
+	Returns:
+		offsets ((int, int)[]): dx, dy pairs.
+	"""
+	if topology == HEX:
+		return HEX_EVEN_OFFSETS if x % 2 == 0 else HEX_ODD_OFFSETS
+	return SQUARE_OFFSETS
+
+
+def _row_template(topology, size_x, size_y, y):
+	"""Neighbour offsets of every cell in row y.
+
+	Returns:
+		template ((int, ...)[]): Offsets from each cell's own flat index,
+			one tuple per column. Equal tuples are shared.
+	"""
+	shared = dict()
+	template = list()
+	for x in range(size_x):
+		relative = tuple(dy*size_x + dx for dx, dy in offsets(topology, x) if 0 <= x+dx < size_x and 0 <= y+dy < size_y)
+		template.append(shared.setdefault(relative, relative))
+	return template
+
+
+@lru_cache(maxsize=16)
+def neighbour_rows(topology, size_x, size_y):
+	"""Builds the clipped neighbour offsets of a board shape.
+
+	Only the first, last and an inner row differ, so three row templates are
+	built and every row refers to one of them.
+
+	Args:
+		topology (str): Either SQUARE or HEX.
+		size_x (int): The size of how many cells there should be in a column.
+		size_y (int): The size of how many cells there should be in a row.
+
+	Returns:
+		rows ((int, ...)[][]): For every row, the offsets of each column.
+	"""
+	templates = dict()
+	for y in {0, min(1, size_y-1), size_y-1}:
+		templates[y] = _row_template(topology, size_x, size_y, y)
+	inner = templates[min(1, size_y-1)]
+	return [templates.get(y, inner) for y in range(size_y)]
+
+
+@lru_cache(maxsize=2)
+def count_masks(topology, size_x, size_y):
+	"""Shift and column mask pairs used to count neighbours in one pass.
+
+	Boards are treated as one big little endian integer with a byte per
+	cell. For every offset, shifting that integer by ``k`` bytes lines cell
+	``i + k`` up with cell ``i``, and the mask keeps the columns the offset
+	applies to: those inside the board and, on hex boards, of the right
+	parity. Rows falling off either end are dropped by the shift itself.
+
+	The masks are as large as the board, so only the last two shapes are
+	kept.
+
+	Args:
+		topology (str): Either SQUARE or HEX.
+		size_x (int): The size of how many cells there should be in a column.
+		size_y (int): The size of how many cells there should be in a row.
+
+	Returns:
+		masks ((int, int)[]): Byte shift and mask integer per offset.
+	"""
+	columns = dict()
+	for x in range(size_x):
+		for dx, dy in offsets(topology, x):
+			if 0 <= x+dx < size_x:
+				columns.setdefault((dx, dy), bytearray(size_x))[x] = 1
+	masks = list()
+	for (dx, dy), row in columns.items():
+		masks.append((dy*size_x + dx, int.from_bytes(bytes(row) * size_y, 'little')))
+	return masks
+
+
+def count_neighbours(bomb, topology, size_x, size_y):
+	"""Counts the neighbouring bombs of every cell in one pass.
+
+	The bomb array is read as one integer and summed over its shifted copies,
+	see count_masks. No count exceeds a byte so the sum never carries
+	between cells.
+
+	Args:
+		bomb (bytes): 1 where the cell contains a bomb, one byte per cell.
+		topology (str): Either SQUARE or HEX.
+		size_x (int): The size of how many cells there should be in a column.
+		size_y (int): The size of how many cells there should be in a row.
+
+	Returns:
+		number (bytes): The number of neighbouring bombs of every cell.
+	"""
+	mines = int.from_bytes(bomb, 'little')
+	total = 0
+	for k, mask in count_masks(topology, size_x, size_y):
+		if k > 0:
+			total += (mines >> 8*k) & mask
+		else:
+			total += (mines << -8*k) & mask
+	return total.to_bytes(size_x*size_y, 'little')
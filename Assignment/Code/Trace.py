@@ -0,0 +1,144 @@
+"""Latency tracing for input events.
+
+Switched on by setting MINESWEEPER_TRACE to the file the report is written
+to on exit ("1" writes minesweeper-trace.json). Call sites bracket each
+phase of an event:
+
+	t = Trace.now()
+	i = self.event_cell(event)
+	t = Trace.record(Trace.HIT_TEST, t)
+
+When tracing is off now and record are bound to functions that return 0 and
+do nothing else, so the cost is two calls per phase and no branches.
+
+When on, every sample goes into a fixed-size ring buffer holding the most
+recent events, and into a per-phase log scale histogram (eight buckets per
+power of two, so percentiles are within 12.5%) covering the whole session.
+"""
+
+import atexit
+import json
+import os
+import time
+from array import array
+
+HIT_TEST = 0
+MODEL = 1
+WIN_CHECK = 2
+FLUSH = 3
+DB_WRITE = 4
+PHASES = ("hit_test", "model", "win_check", "flush", "db_write")
+
+RING = 4096
+# Sub-buckets per power of two, as a power of two.
+SUB_BITS = 3
+
+path = os.environ.get("MINESWEEPER_TRACE")
+if path == "1":
+	path = "minesweeper-trace.json"
+ENABLED = bool(path)
+
+ring_phase = bytearray(RING)
+ring_nanos = array('q', bytes(8 * RING))
+position = 0
+histograms = [[0] * (64 << SUB_BITS) for _ in PHASES]
+maximum = [0] * len(PHASES)
+
+
+def bucket(nanos):
+	"""Histogram bucket of a duration: its power of two and the next bits."""
+	top = nanos.bit_length()
+	if top <= SUB_BITS + 1:
+		return nanos
+	shift = top - 1 - SUB_BITS
+	return ((top - SUB_BITS) << SUB_BITS) + ((nanos >> shift) & ((1 << SUB_BITS) - 1))
+
+
+def bucket_limit(index):
+	"""Largest duration that falls into a bucket."""
+	if index < (2 << SUB_BITS):
+		return index
+	top = (index >> SUB_BITS) + SUB_BITS
+	shift = top - 1 - SUB_BITS
+	lower = (1 << (top - 1)) | ((index & ((1 << SUB_BITS) - 1)) << shift)
+	return lower + (1 << shift) - 1
+
+
+def traced_record(phase, start):
+	"""Records the time since start against a phase.
+
+	Args:
+		phase (int): One of the phase constants.
+		start (int): Value of now() when the phase began.
+
+	Returns:
+		end (int): The current time, to start the next phase with.
+	"""
+	global position
+	end = time.perf_counter_ns()
+	nanos = end - start
+	slot = position % RING
+	ring_phase[slot] = phase
+	ring_nanos[slot] = nanos
+	position += 1
+	histograms[phase][bucket(nanos)] += 1
+	if nanos > maximum[phase]:
+		maximum[phase] = nanos
+	return end
+
+
+def percentile(counts, fraction):
+	total = sum(counts)
+	wanted = fraction * total
+	seen = 0
+	for index, count in enumerate(counts):
+		seen += count
+		if count and seen >= wanted:
+			return bucket_limit(index)
+	return 0
+
+
+def report():
+	"""Summarises the histograms and the recent samples.
+
+	Returns:
+		report (dict): Per phase count, p50, p95, p99 and max in
+			microseconds, and the samples left in the ring buffer.
+	"""
+	phases = dict()
+	for phase, name in enumerate(PHASES):
+		counts = histograms[phase]
+		if not any(counts):
+			continue
+		phases[name] = {
+			"count": sum(counts),
+			"p50_us": percentile(counts, 0.50) / 1000,
+			"p95_us": percentile(counts, 0.95) / 1000,
+			"p99_us": percentile(counts, 0.99) / 1000,
+			"max_us": maximum[phase] / 1000,
+		}
+	first = max(0, position - RING)
+	recent = [[PHASES[ring_phase[k % RING]], ring_nanos[k % RING] / 1000] for k in range(first, position)]
+	return {"phases": phases, "recent_us": recent}
+
+
+def dump():
+	with open(path, "w") as f:
+		json.dump(report(), f, indent=1)
+
+
+def now_off():
+	return 0
+
+
+def record_off(phase, start):
+	return 0
+
+
+if ENABLED:
+	now = time.perf_counter_ns
+	record = traced_record
+	atexit.register(dump)
+else:
+	now = now_off
+	record = record_off
@@ -0,0 +1,66 @@
+"""Tests for the Tk board view, skipped when no display is available."""
+
+import tkinter as tk
+from concurrent.futures import Future
+
+import pytest
+
+import Engine
+import NormalGrid
+
+
+class Scores:
+	def __init__(self):
+		self.rows = list()
+
+	def add(self, row, log=None):
+		self.rows.append((row, log))
+
+
+class Event:
+	def __init__(self, x, y):
+		self.x = x
+		self.y = y
+
+
+@pytest.fixture
+def root():
+	try:
+		root = tk.Tk()
+	except tk.TclError:
+		pytest.skip("no display")
+	root.withdraw()
+	yield root
+	root.destroy()
+
+
+def click_point(board, i):
+	x, y = board.model.coords(i)
+	px, py = board.text_position(x, y)
+	return Event(px - board.canv.canvasx(0), py - board.canv.canvasy(0))
+
+
+def test_flags_before_a_no_guess_board_is_generated(root):
+	scores = Scores()
+	board = NormalGrid.Board(tk.Toplevel(root), 10, 10, 8, 120, "Easy", scores, no_guess=True)
+	assert board.pending_bombs
+	for _ in range(2):
+		board.onObjectRightClick(click_point(board, 5))
+	assert not board.over
+	assert not board.model.flag_count
+	assert not scores.rows
+
+
+def test_failed_generation_falls_back_to_a_random_board(root):
+	board = NormalGrid.Board(tk.Toplevel(root), 10, 10, 8, 120, "Easy", Scores(), no_guess=True)
+	first = 55
+	board.generation = Future()
+	board.generation.set_exception(RuntimeError("pool broke"))
+	board.poll_generation(first)
+	assert board.generation is None
+	assert not board.pending_bombs
+	assert len(board.model.bombs) == 8
+	assert not board.model.bomb[first]
+	assert not board.model.covered[first]
+	assert "guess" in board.bomb_count.cget("text")
+	assert isinstance(board.model, Engine.Model)
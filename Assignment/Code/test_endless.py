@@ -0,0 +1,51 @@
+"""Tests for endless boards split into chunks."""
+
+import pytest
+
+import Endless
+from Endless import CHUNK
+from Topology import HEX, SQUARE, offsets
+
+
+def mine(model, x, y):
+	return model.mask(x // CHUNK, y // CHUNK)[(y % CHUNK)*CHUNK + x % CHUNK]
+
+
+@pytest.mark.parametrize("topology", [SQUARE, HEX])
+def test_numbers_across_chunk_seams(topology):
+	model = Endless.ChunkedModel(11, 300, topology)
+	# Every cell within two of the seams around chunk (0, 0), corners included.
+	span = list(range(-2, 2)) + list(range(CHUNK-2, CHUNK+2))
+	for y in range(-2, CHUNK+2):
+		for x in (span if 2 <= y < CHUNK-2 else range(-2, CHUNK+2)):
+			expected = sum(mine(model, x+dx, y+dy) for dx, dy in offsets(topology, x))
+			assert model.number_at(x, y) == expected, (x, y)
+
+
+def test_chunks_are_rebuilt_from_the_seed():
+	first = Endless.ChunkedModel(5, 100)
+	second = Endless.ChunkedModel(5, 100)
+	second.chunk(3, -2)
+	assert first.chunk(-1, 4).bomb == second.chunk(-1, 4).bomb
+	assert first.chunk(3, -2).number == second.chunk(3, -2).number
+
+
+@pytest.mark.parametrize("topology", [SQUARE, HEX])
+def test_reveal_stops_at_the_limit_and_resumes(topology):
+	model = Endless.ChunkedModel(5, 20, topology)
+	x, y = next((x, y) for x in range(CHUNK) for y in range(CHUNK) if not mine(model, x, y) and not model.number_at(x, y))
+	changed = model.reveal(x, y, limit=500)
+	assert 500 <= len(changed) < 500 + 8
+	assert model.revealed == len(changed)
+	edge = [cell for cell in changed if not model.number_at(*cell)
+		and any(model.is_covered(cell[0]+dx, cell[1]+dy) for dx, dy in offsets(topology, cell[0]))]
+	assert edge
+	more = model.reveal(*edge[0], limit=500)
+	assert more and not set(more) & set(changed)
+	assert not model.exploded
+
+
+def test_default_reveal_is_bounded():
+	model = Endless.ChunkedModel(5, 20)
+	changed = model.reveal(0, 0)
+	assert len(changed) < Endless.REVEAL_LIMIT + 8
@@ -0,0 +1,115 @@
+"""Tests for the headless engine.
+
+Run from this folder with python -m pytest.
+"""
+
+import random
+
+import pytest
+
+import Engine
+
+MODELS = [(Engine.Model, Engine.SQUARE), (Engine.Model, Engine.HEX), (Engine.ColourModel, Engine.HEX)]
+
+
+def play(model, rng, moves):
+	"""Makes random reveals and flags until the game ends or moves run out."""
+	for _ in range(moves):
+		if model.exploded or model.check_game():
+			break
+		i = rng.randrange(model.size)
+		if rng.random() < 0.3:
+			model.add_flag(i)
+		else:
+			model.reveal(i)
+
+
+@pytest.mark.parametrize("model_class, topology", MODELS)
+def test_random_play_keeps_counters(model_class, topology):
+	rng = random.Random(1)
+	for _ in range(50):
+		model = model_class(rng.randint(2, 12), rng.randint(2, 12), topology, validate=True, seed=rng.getrandbits(64))
+		model.place_bombs(rng.randint(1, model.size // 3 + 1))
+		play(model, rng, 60)
+		model.check_counters()
+
+
+def test_validation_catches_a_wrong_counter():
+	model = Engine.Model(6, 6, validate=True, seed=1)
+	model.place_bombs(5)
+	model.safe_covered -= 1
+	with pytest.raises(AssertionError):
+		model.check_game()
+
+
+def test_win_by_flags_and_by_reveals():
+	model = Engine.Model(5, 5, seed=2)
+	model.place_bombs(4)
+	for i in model.bombs:
+		model.add_flag(i)
+	assert model.check_game()
+	model.add_flag(next(i for i in range(model.size) if not model.bomb[i]))
+	assert not model.check_game()
+
+	model = Engine.Model(5, 5, seed=2)
+	model.place_bombs(4)
+	for i in range(model.size):
+		if not model.bomb[i]:
+			model.reveal(i)
+	assert model.check_game()
+
+
+def test_colour_index_matches_scan():
+	rng = random.Random(4)
+	for _ in range(30):
+		model = Engine.ColourModel(rng.randint(3, 10), rng.randint(3, 10), seed=rng.getrandbits(64))
+		model.place_bombs(rng.randint(1, model.size // 4 + 1))
+		for _ in range(rng.randint(1, model.size)):
+			model.reveal(rng.randrange(model.size))
+			if model.exploded:
+				break
+		for i in range(model.size):
+			future = model.future_colour(i)
+			touching = any(model.colour[n] == future for n in model.neighbours(i))
+			assert model.would_conflict(i) == touching
+		hazards = [i for i in range(model.size) if model.colour[i] == Engine.UNPAINTED
+			and any(model.colour[n] == model.future_colour(i) for n in model.neighbours(i))]
+		assert model.hazard_cells() == hazards
+
+
+def test_board_without_bombs_is_not_won():
+	model = Engine.Model(4, 4, validate=True)
+	assert not model.check_game()
+	model.add_flag(5)
+	model.add_flag(5)
+	assert not model.check_game()
+	model.reveal(0)
+	assert not model.check_game()
+
+
+@pytest.mark.parametrize("model_class, topology", MODELS)
+def test_dumps_loads_round_trip(model_class, topology):
+	model = model_class(13, 7, topology, seed=99)
+	model.place_bombs(20)
+	loaded = Engine.loads(Engine.dumps(model), model_class)
+	assert (loaded.size_x, loaded.size_y, loaded.topology, loaded.seed) == (13, 7, topology, 99)
+	assert loaded.bombs == sorted(model.bombs)
+	assert loaded.number == model.number
+	assert loaded.from_seed()
+
+
+@pytest.mark.parametrize("mines", [3, 60])
+def test_set_mask_finds_sparse_and_dense_bombs(mines):
+	rng = random.Random(mines)
+	model = Engine.Model(10, 10, validate=True)
+	model.add_flag(0)
+	bombs = rng.sample(range(model.size), mines)
+	model.set_mask(bytes(i in bombs for i in range(model.size)))
+	assert model.bombs == sorted(bombs)
+	model.check_counters()
+
+
+def test_from_seed_rejects_boards_set_directly():
+	model = Engine.Model(8, 8, seed=7)
+	model.set_bombs([1, 2, 3])
+	assert not model.from_seed()
@@ -0,0 +1,51 @@
+"""Tests for the mine probability calculator."""
+
+import random
+
+import pytest
+
+import Engine
+import Probability
+from test_solver import brute_force, small_boards
+
+
+def strip(length, seed):
+	"""A 3 row board whose bottom rows are open and top row is all frontier.
+
+	The rows are uncovered directly, a flood fill would open the top row.
+	"""
+	rng = random.Random(seed)
+	model = Engine.Model(length, 3, seed=seed)
+	model.set_bombs(rng.sample(range(length), length * 4 // 15))
+	for i in range(length, 3*length):
+		model.covered[i] = 0
+	model.revealed = 2*length
+	model.safe_covered = length - len(model.bombs)
+	return model
+
+
+def test_probability_matches_brute_force():
+	for model in small_boards(150, 4):
+		odds, other = Probability.Probability(model).probabilities()
+		for i, chance in brute_force(model).items():
+			assert odds.get(i, other) == pytest.approx(chance, abs=1e-9)
+
+
+def test_long_frontier_needs_no_recursion():
+	model = strip(1500, 1)
+	odds, _ = Probability.Probability(model).probabilities()
+	assert len(odds) > 1000
+	assert all(0 <= chance <= 1 for chance in odds.values())
+
+
+def test_components_over_budget_are_estimated(monkeypatch):
+	model = strip(60, 2)
+	exact = Probability.Probability(model)
+	expected, _ = exact.probabilities()
+	assert exact.approximate == 0
+	monkeypatch.setattr(Probability, "count_solutions", lambda cells, members, needs: None)
+	estimated = Probability.Probability(model)
+	odds, _ = estimated.probabilities()
+	assert estimated.approximate > 0
+	assert odds.keys() == expected.keys()
+	assert all(0 <= chance <= 1 for chance in odds.values())
@@ -0,0 +1,67 @@
+"""Tests for move logs and score verification."""
+
+import sqlite3
+
+import Engine
+import Replay
+import Scores
+
+
+def won_game(seed):
+	"""Plays a 9x9 board to a win by revealing every safe cell.
+
+	Returns:
+		log (bytes): The finished move log.
+	"""
+	model = Engine.Model(9, 9, Engine.SQUARE, seed=seed)
+	model.place_bombs(10)
+	recorder = Replay.Recorder("normal", 120)
+	for i in range(model.size):
+		if not model.bomb[i] and model.covered[i]:
+			recorder.record(Replay.REVEAL, i)
+			model.reveal(i)
+	assert model.check_game()
+	return recorder.finish(model)
+
+
+def test_verify_accepts_a_win_and_rejects_tampering():
+	log = won_game(3)
+	row = ("normal", "Easy", "player", 9, 9, 10, 120)
+	assert Replay.verify(log, row) == (True, "")
+	assert not Replay.verify(log, row[:6] + (121,))[0]
+	assert not Replay.verify(log, ("normal", "Easy", "player", 9, 9, 11, 120))[0]
+	assert not Replay.verify(log[:-1], row)[0]
+
+
+def test_audit_reads_without_changing_the_database(tmp_path, monkeypatch):
+	# One log per chunk, so the audit has to wait for chunks in flight.
+	monkeypatch.setattr(Replay, "CHUNK", 1)
+	path = str(tmp_path / "scores.db")
+	database = sqlite3.connect(path)
+	for statement in Scores.SCHEMA:
+		database.execute(statement)
+	rows = [("normal", "Easy", "p", 9, 9, 10, 120), ("normal", "Easy", "cheat", 9, 9, 10, 200), ("normal", "Easy", "none", 9, 9, 10, 1)]
+	for n, row in enumerate(rows):
+		rowid = database.execute("INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?, ?)", row).lastrowid
+		if n < 2:
+			database.execute("INSERT INTO replays (score_id, log) VALUES (?, ?)", (rowid, won_game(n)))
+	database.commit()
+	database.close()
+	with open(path, "rb") as f:
+		before = f.read()
+
+	checked, missing, failures, _ = Replay.audit(path, workers=1)
+	assert (checked, missing) == (2, 1)
+	assert failures == [(2, "score is more than the time left")]
+	with open(path, "rb") as f:
+		assert f.read() == before
+
+
+def test_audit_of_a_database_without_replays(tmp_path):
+	path = str(tmp_path / "old.db")
+	database = sqlite3.connect(path)
+	database.execute(Scores.SCHEMA[0])
+	database.execute("INSERT INTO scores VALUES ('normal', 'Easy', 'p', 9, 9, 10, 5)")
+	database.commit()
+	database.close()
+	assert Replay.audit(path, workers=1)[:3] == (0, 1, [])
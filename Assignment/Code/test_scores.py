@@ -0,0 +1,102 @@
+"""Tests for high score storage."""
+
+import random
+import sqlite3
+
+import pytest
+
+import Scores
+
+
+@pytest.fixture
+def database(tmp_path):
+	database = sqlite3.connect(str(tmp_path / "scores.db"))
+	Scores.prepare(database)
+	yield database
+	database.close()
+
+
+def fill(database, count, seed):
+	"""Inserts scores with many ties across two levels."""
+	rng = random.Random(seed)
+	with database:
+		for n in range(count):
+			level = rng.choice(("Easy", "Hard"))
+			database.execute("INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?, ?)", ("normal", level, "p" + str(n), 9, 9, 10, rng.randint(0, 5)))
+
+
+def test_pages_cover_every_tied_score_once(database):
+	fill(database, 500, 1)
+	expected = database.execute(
+		"SELECT rowid, player, score FROM scores WHERE game = 'normal' AND level = 'Hard' "
+		"ORDER BY score DESC, rowid DESC").fetchall()
+	rows = list()
+	after = None
+	while True:
+		page = Scores.top_scores(database, "normal", "Hard", after, limit=7)
+		rows += page
+		if len(page) < 7:
+			break
+		after = (page[-1][2], page[-1][0])
+	assert rows == expected
+
+
+class Writer:
+	"""Stands in for a ScoreWriter, committing on its own connection."""
+
+	def __init__(self, path):
+		self.database = sqlite3.connect(path)
+		self.listeners = list()
+
+	def add(self, row):
+		with self.database:
+			rowid = self.database.execute("INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?, ?)", row).lastrowid
+		for listener in self.listeners:
+			listener(row, rowid)
+		return rowid
+
+
+def insert(path, row):
+	"""Commits a score from another process's point of view."""
+	other = sqlite3.connect(path)
+	with other:
+		other.execute("INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+	other.close()
+
+
+def test_leaderboard_keeps_its_own_writes(database, tmp_path):
+	writer = Writer(str(tmp_path / "scores.db"))
+	board = Scores.Leaderboard(database, writer, size=3)
+	assert board.top("normal", "Easy") == []
+	rowid = writer.add(("normal", "Easy", "a", 9, 9, 10, 7))
+	assert board.top("normal", "Easy") == [(rowid, "a", 7)]
+	assert (board.hits, board.misses, board.invalidations) == (1, 1, 0)
+
+
+def test_leaderboard_drops_the_cache_on_a_foreign_write(database, tmp_path):
+	path = str(tmp_path / "scores.db")
+	writer = Writer(path)
+	board = Scores.Leaderboard(database, writer, size=3)
+	board.top("normal", "Easy")
+	insert(path, ("normal", "Easy", "foreign", 9, 9, 10, 9))
+	# Our own write after the foreign one must not hide it.
+	writer.add(("normal", "Easy", "a", 9, 9, 10, 7))
+	assert [player for _, player, _ in board.top("normal", "Easy")] == ["foreign", "a"]
+	assert board.invalidations == 1
+
+
+def test_leaderboard_keeps_scores_committed_during_a_miss(database, tmp_path, monkeypatch):
+	writer = Writer(str(tmp_path / "scores.db"))
+	board = Scores.Leaderboard(database, writer, size=3)
+	top_scores = Scores.top_scores
+
+	def racing(*args, **kwargs):
+		rows = top_scores(*args, **kwargs)
+		writer.add(("normal", "Easy", "late", 9, 9, 10, 5))
+		return rows
+
+	monkeypatch.setattr(Scores, "top_scores", racing)
+	board.top("normal", "Easy")
+	monkeypatch.setattr(Scores, "top_scores", top_scores)
+	assert [player for _, player, _ in board.top("normal", "Easy")] == ["late"]
+	assert board.invalidations == 0
@@ -0,0 +1,79 @@
+"""Tests for saving and resuming games."""
+
+import random
+
+import pytest
+
+import Engine
+import Replay
+import Snapshot
+
+
+class Clock:
+	"""Stands in for time.monotonic, moved on by hand."""
+	def __init__(self):
+		self.now = 0.0
+
+	def __call__(self):
+		return self.now
+
+
+@pytest.mark.parametrize("level", ["Hard", "Weekend special"])
+def test_snapshot_round_trip(tmp_path, level):
+	rng = random.Random(2)
+	model = Engine.Model(20, 15, Engine.SQUARE, seed=5)
+	model.place_bombs(40)
+	for _ in range(30):
+		if model.exploded or model.check_game():
+			break
+		i = rng.randrange(model.size)
+		if rng.random() < 0.3:
+			model.add_flag(i)
+		else:
+			model.reveal(i)
+	path = str(tmp_path / "game.snap")
+	Snapshot.save(path, model, "normal", level, 300, 120500, b"events")
+	saved = Snapshot.resume(path, validate=True)
+	resumed = saved["model"]
+	assert (saved["game"], saved["level"], saved["time_limit"], saved["elapsed_ms"], saved["time_left"], saved["events"]) == (
+		"normal", level, 300, 120500, 180, b"events")
+	for name in Snapshot.COLUMNS:
+		assert bytes(getattr(resumed, name)) == bytes(getattr(model, name))
+	assert sorted(resumed.bombs) == sorted(model.bombs)
+	resumed.check_counters()
+
+	# A shorter log over a file of the same shape cuts the file down.
+	Snapshot.save(path, model, "normal", level, 300, 130000, b"")
+	assert Snapshot.resume(path)["events"] == b""
+
+
+def test_win_after_resume_still_verifies(tmp_path, monkeypatch):
+	clock = Clock()
+	monkeypatch.setattr(Replay.time, "monotonic", clock)
+	model = Engine.Model(9, 9, Engine.SQUARE, seed=3)
+	model.place_bombs(10)
+	recorder = Replay.Recorder("normal", 120)
+	safe = [i for i in range(model.size) if not model.bomb[i]]
+	path = str(tmp_path / "game.snap")
+	resumes = 0
+	for n, i in enumerate(safe):
+		if not model.covered[i]:
+			continue
+		# Save part way through a second and move again straight after the
+		# resume, twice, the second time over the file the first resume
+		# still has mapped.
+		if resumes < 2 and n >= (resumes + 1) * len(safe) // 3:
+			resumes += 1
+			clock.now += 0.1
+			Snapshot.save(path, model, "normal", "Easy", 120, recorder.elapsed_ms(), recorder.events)
+			clock.now += 20
+			saved = Snapshot.resume(path)
+			model = saved["model"]
+			recorder = Replay.Recorder("normal", 120, saved["events"], saved["elapsed_ms"])
+		else:
+			clock.now += 0.7
+		recorder.record(Replay.REVEAL, i)
+		model.reveal(i)
+	assert model.check_game() and resumes == 2
+	score = Replay.score_at(120, recorder.elapsed_ms())
+	assert Replay.verify(recorder.finish(model), ("normal", "Easy", "player", 9, 9, 10, score)) == (True, "")
@@ -0,0 +1,61 @@
+"""Tests for the constraint propagation solver."""
+
+import itertools
+import random
+
+import Engine
+import Solver
+
+
+def brute_force(model):
+	"""Chance of a mine on every covered cell, from every consistent layout."""
+	covered = [i for i in range(model.size) if model.covered[i]]
+	numbers = [i for i in range(model.size) if not model.covered[i]]
+	counts = dict.fromkeys(covered, 0)
+	total = 0
+	for layout in itertools.combinations(covered, len(model.bombs)):
+		mines = set(layout)
+		if all(sum(n in mines for n in model.neighbours(c)) == model.number[c] for c in numbers):
+			total += 1
+			for i in layout:
+				counts[i] += 1
+	return {i: counts[i] / total for i in covered}
+
+
+def small_boards(count, seed):
+	"""Small square and hex boards with a few safe cells revealed."""
+	rng = random.Random(seed)
+	boards = list()
+	while len(boards) < count:
+		model = Engine.Model(rng.randint(3, 5), rng.randint(3, 5), rng.choice((Engine.SQUARE, Engine.HEX)))
+		model.set_bombs(rng.sample(range(model.size), rng.randint(1, 6)))
+		for _ in range(rng.randint(1, 4)):
+			safe = [i for i in range(model.size) if model.covered[i] and not model.bomb[i]]
+			if safe:
+				model.reveal(rng.choice(safe))
+		covered = sum(model.covered)
+		if 0 < covered <= 14:
+			boards.append(model)
+	return boards
+
+
+def test_solver_matches_brute_force():
+	for model in small_boards(150, 3):
+		safe, mines = Solver.Solver(model).solve()
+		exact = brute_force(model)
+		assert all(exact[i] == 0 for i in safe)
+		assert all(exact[i] == 1 for i in mines)
+
+
+def test_solve_game_only_reveals_safe_cells():
+	rng = random.Random(6)
+	solved = 0
+	for _ in range(40):
+		model = Engine.Model(9, 9, rng.choice((Engine.SQUARE, Engine.HEX)), validate=True, seed=rng.getrandbits(64))
+		first = 40
+		model.set_bombs(rng.sample([i for i in range(model.size) if i != first and i not in model.neighbours(first)], 10))
+		won = Solver.solve_game(model, first)
+		assert not model.exploded
+		assert won == model.check_game()
+		solved += won
+	assert solved
@@ -0,0 +1,38 @@
+"""Tests for the shared neighbour tables and the one pass neighbour count."""
+
+import random
+
+import pytest
+
+import Topology
+
+SHAPES = [(1, 1), (1, 5), (5, 1), (2, 2), (3, 4), (7, 6), (12, 9)]
+
+
+def scan(topology, size_x, size_y, x, y):
+	"""Flat indices of the neighbours of a cell, from the offsets directly."""
+	return sorted((y+dy)*size_x + x+dx for dx, dy in Topology.offsets(topology, x)
+		if 0 <= x+dx < size_x and 0 <= y+dy < size_y)
+
+
+@pytest.mark.parametrize("topology", [Topology.SQUARE, Topology.HEX])
+@pytest.mark.parametrize("size_x, size_y", SHAPES)
+def test_neighbour_rows_match_scan(topology, size_x, size_y):
+	rows = Topology.neighbour_rows(topology, size_x, size_y)
+	assert len(rows) == size_y
+	for y in range(size_y):
+		for x in range(size_x):
+			i = y*size_x + x
+			assert sorted(i + d for d in rows[y][x]) == scan(topology, size_x, size_y, x, y)
+
+
+@pytest.mark.parametrize("topology", [Topology.SQUARE, Topology.HEX])
+@pytest.mark.parametrize("size_x, size_y", SHAPES)
+def test_count_neighbours_matches_scan(topology, size_x, size_y):
+	rng = random.Random(size_x*100 + size_y)
+	for _ in range(5):
+		bomb = bytes(rng.random() < 0.4 for _ in range(size_x*size_y))
+		number = Topology.count_neighbours(bomb, topology, size_x, size_y)
+		for y in range(size_y):
+			for x in range(size_x):
+				assert number[y*size_x + x] == sum(bomb[n] for n in scan(topology, size_x, size_y, x, y))
@@ -0,0 +1,31 @@
+"""Tests for the latency histogram buckets."""
+
+import random
+
+import Trace
+
+
+def values():
+	rng = random.Random(9)
+	yield from range(0, 4096)
+	for _ in range(5000):
+		yield rng.randrange(1 << rng.randrange(1, 62))
+
+
+def test_every_value_is_within_its_bucket():
+	for nanos in values():
+		index = Trace.bucket(nanos)
+		assert index < len(Trace.histograms[0])
+		assert nanos <= Trace.bucket_limit(index)
+		assert index == 0 or Trace.bucket_limit(index - 1) < nanos
+
+
+def test_buckets_are_ordered_and_tight():
+	last = -1
+	for index in range(len(Trace.histograms[0])):
+		limit = Trace.bucket_limit(index)
+		assert limit > last
+		assert Trace.bucket(limit) == index
+		if last >= 0:
+			assert limit - last <= max(1, (last + 1) >> Trace.SUB_BITS)
+		last = limit